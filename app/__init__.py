@@ -1,5 +1,6 @@
 from flask import Flask
 import os
+import multiprocessing
 import yaml
 
 def create_app():
@@ -20,4 +21,13 @@ def create_app():
     from .services import migrate_to_profiles
     migrate_to_profiles()
 
+    from .render_backend import RENDER_BACKEND, start_render_pool
+    # Spawned render workers re-import the main module; only the parent owns the pool
+    if RENDER_BACKEND == 'process' and multiprocessing.current_process().name == 'MainProcess':
+        start_render_pool()
+
+    from .jobs import start_job_workers
+    if multiprocessing.current_process().name == 'MainProcess':
+        start_job_workers()
+
     return app
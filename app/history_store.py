@@ -0,0 +1,338 @@
+import os
+import json
+import base64
+import bisect
+import threading
+from collections import OrderedDict
+
+
+class HistoryStore:
+    """Append-only JSON Lines log with an on-disk index.
+
+    Records live in `path`, one JSON object per line. `path + '.idx'` holds
+    one small row per record (id, timestamp, byte offset/length and any
+    `index_fields`), so a process can filter and page through history and
+    fetch a record by id without parsing the whole log. On refresh only
+    rows appended by other processes are read. A legacy JSON array file, if
+    present, is converted on first load.
+    """
+
+    # Parsed records kept in memory, keyed by byte offset
+    RECORD_CACHE_SIZE = 256
+
+    def __init__(self, path, legacy_path=None, index_fields=()):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self.legacy_path = legacy_path
+        self.index_fields = tuple(index_fields)
+        self._lock = threading.RLock()
+        self._records = OrderedDict()
+        self._reset(None)
+
+    # -- reading ---------------------------------------------------------
+
+    def all(self):
+        """Every record in log order."""
+        with self._lock:
+            self._refresh()
+            return self.read_range(0, len(self._rows) - 1)
+
+    def count(self):
+        with self._lock:
+            self._refresh()
+            return len(self._rows)
+
+    def get(self, entry_id):
+        with self._lock:
+            self._refresh()
+            position = self._positions.get(entry_id)
+            if position is None:
+                return None
+            return self._read(self._rows[position])
+
+    def position(self, entry_id):
+        """Index of entry_id in log order, or None."""
+        with self._lock:
+            self._refresh()
+            return self._positions.get(entry_id)
+
+    def read_range(self, first, last):
+        """Records first..last (inclusive, log order) with a single read."""
+        with self._lock:
+            self._refresh()
+            rows = self._rows[first:last + 1]
+            if not rows:
+                return []
+            # Rows are almost always in offset order, but concurrent writers can interleave
+            start = min(row['off'] for row in rows)
+            end = max(row['off'] + row['len'] for row in rows)
+            with open(self.path, 'rb') as f:
+                f.seek(start)
+                chunk = f.read(end - start)
+            return [
+                json.loads(chunk[row['off'] - start:row['off'] - start + row['len']])
+                for row in rows
+            ]
+
+    def read_positions(self, positions):
+        with self._lock:
+            return [self._read(self._rows[p]) for p in positions]
+
+    def query(self, cursor=None, limit=None, since=None, until=None, match=None):
+        """Page through records newest first.
+
+        since/until bound the ISO timestamp (inclusive). match, if given, is
+        called with each index row. Returns (positions, next_cursor), where
+        positions index into log order and next_cursor is None on the last page.
+        """
+        with self._lock:
+            self._refresh()
+            keys = self._ordered
+            if cursor:
+                i = bisect.bisect_left(keys, _decode_cursor(cursor)) - 1
+            else:
+                i = len(keys) - 1
+
+            positions = []
+            next_cursor = None
+            while i >= 0:
+                timestamp, offset = keys[i]
+                i -= 1
+                if until and timestamp > until:
+                    continue
+                if since and timestamp < since:
+                    break
+                position = self._by_offset[offset]
+                if match is not None and not match(self._rows[position]):
+                    continue
+                if limit is not None and len(positions) == limit:
+                    next_cursor = _encode_cursor(self._ordered_key(positions[-1]))
+                    break
+                positions.append(position)
+            return positions, next_cursor
+
+    # -- writing ---------------------------------------------------------
+
+    def append(self, entry):
+        self.extend([entry])
+
+    def extend(self, entries):
+        """Append entries to the log and the index, one fsync'd write each."""
+        if not entries:
+            return
+        lines = [(json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8') for entry in entries]
+        data = b''.join(lines)
+        with self._lock:
+            self._refresh()
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                _write_all(fd, data)
+                os.fsync(fd)
+                # With O_APPEND our position is the end of our own write
+                offset = os.lseek(fd, 0, os.SEEK_CUR) - len(data)
+            finally:
+                os.close(fd)
+
+            rows = []
+            for entry, line in zip(entries, lines):
+                rows.append(self._make_row(entry, offset, len(line)))
+                offset += len(line)
+            index_data = b''.join(
+                (json.dumps(row, separators=(',', ':')) + '\n').encode('utf-8') for row in rows
+            )
+            fd = os.open(self.index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                _write_all(fd, index_data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self._refresh()
+
+    # -- internals -------------------------------------------------------
+
+    def _reset(self, file_id):
+        self._rows = []
+        self._positions = {}
+        self._by_offset = {}
+        self._ordered = []
+        self._index_offset = 0
+        self._log_indexed_end = 0
+        self._file_id = file_id
+        self._records.clear()
+
+    def _make_row(self, entry, offset, length):
+        row = {'id': entry.get('id'), 'ts': entry.get('timestamp', ''), 'off': offset, 'len': length}
+        for field in self.index_fields:
+            if field in entry:
+                row[field] = entry[field]
+        return row
+
+    def _ordered_key(self, position):
+        row = self._rows[position]
+        return (row['ts'], row['off'])
+
+    def _add_row(self, row):
+        if row['off'] in self._by_offset:
+            return
+        position = len(self._rows)
+        self._rows.append(row)
+        self._by_offset[row['off']] = position
+        if row.get('id') is not None:
+            self._positions[row['id']] = position
+        key = (row['ts'], row['off'])
+        if not self._ordered or key > self._ordered[-1]:
+            self._ordered.append(key)
+        else:
+            bisect.insort(self._ordered, key)
+        self._log_indexed_end = max(self._log_indexed_end, row['off'] + row['len'])
+
+    def _read(self, row):
+        record = self._records.get(row['off'])
+        if record is not None:
+            self._records.move_to_end(row['off'])
+            return record
+        with open(self.path, 'rb') as f:
+            f.seek(row['off'])
+            record = json.loads(f.read(row['len']))
+        self._records[row['off']] = record
+        while len(self._records) > self.RECORD_CACHE_SIZE:
+            self._records.popitem(last=False)
+        return record
+
+    def _refresh(self):
+        if self._file_id is None:
+            self._migrate_legacy()
+
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset(None)
+            return
+
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id or stat.st_size < self._log_indexed_end:
+            # The log was replaced or truncated; start over
+            self._reset(file_id)
+            if not os.path.exists(self.index_path):
+                self._write_full_index()
+
+        self._read_index()
+        if stat.st_size > self._log_indexed_end:
+            # Records whose index rows are not written yet (a concurrent
+            # append, or a crash in between); index them in memory only
+            self._scan_log(stat.st_size)
+
+    def _read_index(self):
+        try:
+            size = os.path.getsize(self.index_path)
+        except OSError:
+            return
+        if size <= self._index_offset:
+            return
+        with open(self.index_path, 'rb') as f:
+            f.seek(self._index_offset)
+            chunk = f.read(size - self._index_offset)
+        # Only consume complete lines; a torn trailing write is retried later
+        end = chunk.rfind(b'\n') + 1
+        for line in chunk[:end].splitlines():
+            if line.strip():
+                self._add_row(json.loads(line))
+        self._index_offset += end
+
+    def _scan_log(self, size):
+        start = self._log_indexed_end
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            chunk = f.read(size - start)
+        end = chunk.rfind(b'\n') + 1
+        offset = start
+        for line in chunk[:end].splitlines(keepends=True):
+            if line.strip():
+                self._add_row(self._make_row(json.loads(line), offset, len(line)))
+            offset += len(line)
+
+    def _write_full_index(self):
+        """Rebuild a missing index file from the log."""
+        rows = []
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                if line.strip():
+                    rows.append(self._make_row(json.loads(line), offset, len(line)))
+                offset += len(line)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(row, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.link(tmp_path, self.index_path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+
+    def _migrate_legacy(self):
+        """One-time conversion of a JSON array file into the JSON Lines log."""
+        if os.path.exists(self.path) or not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, 'r') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            # Another process migrated it first
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            # Create-if-absent, so a concurrent migration cannot clobber appended entries
+            os.link(tmp_path, self.path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+        try:
+            os.replace(self.legacy_path, f"{self.legacy_path}.migrated")
+        except FileNotFoundError:
+            pass
+
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _encode_cursor(key):
+    raw = json.dumps(list(key), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def _decode_cursor(cursor):
+    try:
+        timestamp, offset = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    return (timestamp, offset)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_history_store(path, legacy_path=None, index_fields=()):
+    """Return the process-wide store for path, creating it on first use."""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = HistoryStore(path, legacy_path, index_fields)
+            _stores[path] = store
+        return store
@@ -0,0 +1,213 @@
+"""Background jobs persisted in SQLite and run on a bounded thread pool.
+
+Handlers are registered per job type with register_job_type(name, fn) and
+called as fn(params, progress), where progress(stage, **data) records the
+job's latest progress. A handler's return value must be JSON-serializable
+and becomes the job result.
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# SQLite file holding queued, running and finished jobs
+JOBS_DB = os.getenv("JOBS_DB", "jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Jobs allowed to wait for a free worker before new ones are rejected
+JOB_MAX_QUEUE = int(os.getenv("JOB_MAX_QUEUE", "100"))
+# Seconds finished jobs are kept (default one week)
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", str(7 * 24 * 3600)))
+
+FINISHED_STATUSES = ('succeeded', 'failed')
+
+# Identifies this server process in the owner column; a restarted server can
+# get the same PID, but never the same boot id
+BOOT_ID = f"{os.getpid()}:{uuid.uuid4().hex}"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    owner TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created);
+"""
+
+
+class JobQueueFullError(Exception):
+    """Raised when JOB_WORKERS + JOB_MAX_QUEUE jobs are already pending."""
+
+
+class UnknownJobTypeError(Exception):
+    """Raised when no handler is registered for a job type."""
+
+
+_handlers = {}
+_executor = None
+_slots = None
+_executor_lock = threading.Lock()
+_local = threading.local()
+# Notified on every job update so progress streams wake up without polling
+_changed = threading.Condition()
+
+
+def register_job_type(name, handler):
+    _handlers[name] = handler
+
+
+def _connect():
+    conn = getattr(_local, 'conn', None)
+    if conn is None or getattr(_local, 'path', None) != JOBS_DB:
+        conn = sqlite3.connect(JOBS_DB, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        # WAL lets status reads proceed while a worker is writing
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+        _local.path = JOBS_DB
+    return conn
+
+
+def _update(job_id, **fields):
+    assignments = ', '.join(f"{name} = ?" for name in fields)
+    _connect().execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+    with _changed:
+        _changed.notify_all()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _owner_gone(owner):
+    """True unless owner is this process or another live server process."""
+    if owner == BOOT_ID:
+        return False
+    try:
+        pid = int(str(owner).split(':')[0])
+    except ValueError:
+        return True
+    # Our own PID under another boot id belongs to a server that has since exited
+    return pid == os.getpid() or not _pid_alive(pid)
+
+
+def start_job_workers():
+    """Create the worker pool and pick up jobs left over from earlier runs."""
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is not None:
+            return _executor
+        _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='job')
+        _slots = threading.BoundedSemaphore(JOB_WORKERS + JOB_MAX_QUEUE)
+
+    conn = _connect()
+    now = time.time()
+    conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND finished < ?",
+                 (*FINISHED_STATUSES, now - JOB_RETENTION))
+    # Jobs whose process died mid-run cannot be resumed safely
+    for row in conn.execute("SELECT id, owner FROM jobs WHERE status = 'running'").fetchall():
+        if _owner_gone(row['owner']):
+            _update(row['id'], status='failed', error='Interrupted by a server restart', finished=now)
+    for row in conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created").fetchall():
+        if _slots.acquire(blocking=False):
+            _executor.submit(_run, row['id'])
+    return _executor
+
+
+def shutdown_job_workers():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+def submit_job(job_type, params):
+    """Persist a job and queue it; returns the job id."""
+    if job_type not in _handlers:
+        raise UnknownJobTypeError(f"Unknown job type: {job_type}")
+    start_job_workers()
+    if not _slots.acquire(blocking=False):
+        raise JobQueueFullError('Too many pending jobs, try again shortly')
+    job_id = str(uuid.uuid4())
+    try:
+        _connect().execute(
+            "INSERT INTO jobs (id, type, status, params, created) VALUES (?, ?, 'queued', ?, ?)",
+            (job_id, job_type, json.dumps(params), time.time())
+        )
+        _executor.submit(_run, job_id)
+    except Exception:
+        _slots.release()
+        raise
+    return job_id
+
+
+def get_job(job_id, include_result=False):
+    """Job status as a dict, or None. The result is only decoded when asked for."""
+    row = _connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = {
+        'id': row['id'],
+        'type': row['type'],
+        'status': row['status'],
+        'progress': json.loads(row['progress']) if row['progress'] else None,
+        'error': row['error'],
+        'created': row['created'],
+        'started': row['started'],
+        'finished': row['finished']
+    }
+    if include_result and row['result'] is not None:
+        job['result'] = json.loads(row['result'])
+    return job
+
+
+def wait_for_update(timeout):
+    """Block until any job in this process changes or timeout seconds pass."""
+    with _changed:
+        _changed.wait(timeout)
+
+
+def _run(job_id):
+    try:
+        conn = _connect()
+        # Claim the job; another process may already have picked it up
+        claimed = conn.execute(
+            "UPDATE jobs SET status = 'running', started = ?, owner = ? WHERE id = ? AND status = 'queued'",
+            (time.time(), BOOT_ID, job_id)
+        ).rowcount
+        if not claimed:
+            return
+        row = conn.execute("SELECT type, params FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        with _changed:
+            _changed.notify_all()
+
+        def progress(stage, **data):
+            _update(job_id, progress=json.dumps({'stage': stage, **data}))
+
+        try:
+            result = _handlers[row['type']](json.loads(row['params']), progress)
+        except Exception as e:
+            _update(job_id, status='failed', error=str(e), finished=time.time())
+        else:
+            _update(job_id, status='succeeded', result=json.dumps(result), finished=time.time())
+    finally:
+        _slots.release()
@@ -0,0 +1,130 @@
+"""Minimal JSON Patch (RFC 6902) support: add, remove and replace.
+
+make_patch() produces structural diffs between two JSON documents and
+apply_patch() replays them. Lists are diffed after trimming the common
+prefix and suffix, so inserting or deleting a single bullet costs one op.
+"""
+import copy
+
+
+def _escape(token):
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def make_patch(src, dst, path=''):
+    """Return a list of patch operations turning src into dst."""
+    ops = []
+    _diff(src, dst, path, ops)
+    return ops
+
+
+def _diff(src, dst, path, ops):
+    if src == dst:
+        return
+    if isinstance(src, dict) and isinstance(dst, dict):
+        for key in src:
+            if key not in dst:
+                ops.append({'op': 'remove', 'path': f"{path}/{_escape(key)}"})
+        for key, value in dst.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in src:
+                ops.append({'op': 'add', 'path': child, 'value': value})
+            else:
+                _diff(src[key], value, child, ops)
+    elif isinstance(src, list) and isinstance(dst, list):
+        _diff_list(src, dst, path, ops)
+    else:
+        ops.append({'op': 'replace', 'path': path, 'value': dst})
+
+
+def _diff_list(src, dst, path, ops):
+    prefix = 0
+    while prefix < len(src) and prefix < len(dst) and src[prefix] == dst[prefix]:
+        prefix += 1
+    suffix = 0
+    while (suffix < len(src) - prefix and suffix < len(dst) - prefix
+           and src[-1 - suffix] == dst[-1 - suffix]):
+        suffix += 1
+
+    src_mid = src[prefix:len(src) - suffix]
+    dst_mid = dst[prefix:len(dst) - suffix]
+    common = min(len(src_mid), len(dst_mid))
+    for i in range(common):
+        _diff(src_mid[i], dst_mid[i], f"{path}/{prefix + i}", ops)
+    # Remove from the back so earlier indices stay valid
+    for i in range(len(src_mid) - 1, common - 1, -1):
+        ops.append({'op': 'remove', 'path': f"{path}/{prefix + i}"})
+    for i in range(common, len(dst_mid)):
+        ops.append({'op': 'add', 'path': f"{path}/{prefix + i}", 'value': dst_mid[i]})
+
+
+class JsonPatchError(ValueError):
+    """Raised when a patch is malformed or does not match the document."""
+
+
+def apply_patch(doc, patch):
+    """Return a new document with patch applied; doc itself is left untouched."""
+    doc = copy.deepcopy(doc)
+    for op in patch:
+        doc = _apply_op(doc, op)
+    return doc
+
+
+def _list_index(parent, token, op, allow_end=False):
+    """Index for an array token: digits only, within the list (or one past its end for add)."""
+    if allow_end and token == '-':
+        return len(parent)
+    limit = len(parent) if allow_end else len(parent) - 1
+    if not token.isdigit() or (len(token) > 1 and token[0] == '0') or int(token) > limit:
+        raise JsonPatchError(f"Invalid array index {token!r} in {op['path']!r}")
+    return int(token)
+
+
+def _apply_op(doc, op):
+    if not isinstance(op, dict) or op.get('op') not in ('add', 'remove', 'replace'):
+        raise JsonPatchError(f"Unsupported patch op: {op!r}")
+    kind = op['op']
+    path = op.get('path')
+    if not isinstance(path, str) or (path and not path.startswith('/')):
+        raise JsonPatchError(f"Patch op has no valid path: {op!r}")
+    if kind != 'remove' and 'value' not in op:
+        raise JsonPatchError(f"Patch op has no value: {op!r}")
+
+    tokens = [_unescape(t) for t in path.split('/')[1:]]
+    if not tokens:
+        if kind == 'remove':
+            return None
+        return copy.deepcopy(op['value'])
+
+    parent = doc
+    for token in tokens[:-1]:
+        if isinstance(parent, list):
+            parent = parent[_list_index(parent, token, op)]
+        elif isinstance(parent, dict) and token in parent:
+            parent = parent[token]
+        else:
+            raise JsonPatchError(f"Path does not exist: {path!r}")
+
+    last = tokens[-1]
+    if isinstance(parent, list):
+        index = _list_index(parent, last, op, allow_end=kind == 'add')
+        if kind == 'add':
+            parent.insert(index, copy.deepcopy(op['value']))
+        elif kind == 'remove':
+            del parent[index]
+        else:
+            parent[index] = copy.deepcopy(op['value'])
+    elif isinstance(parent, dict):
+        if kind == 'remove' and last not in parent:
+            raise JsonPatchError(f"Path does not exist: {path!r}")
+        if kind == 'remove':
+            del parent[last]
+        else:
+            parent[last] = copy.deepcopy(op['value'])
+    else:
+        raise JsonPatchError(f"Path does not exist: {path!r}")
+    return doc
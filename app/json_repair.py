@@ -0,0 +1,135 @@
+"""Tolerant extraction of a JSON object from model output.
+
+extract_json_object() scans the text once from the first '{', tracking
+strings and bracket depth, and returns the outermost balanced object. On the
+way it drops trailing commas and inserts closers the model forgot. If the
+text ends before the object closes (a truncated response), it is cut back
+to the last complete value and closed, so an incomplete value is dropped
+rather than kept half-written.
+
+missing_sections() then compares the result with the resume that was sent,
+so the caller can ask the model for just the sections that did not survive.
+"""
+import json
+
+_CLOSERS = {'{': '}', '[': ']'}
+# Give up after this many balanced candidates fail to parse (e.g. "{name}" in chatter)
+MAX_CANDIDATES = 8
+
+
+class IncompleteResponseError(ValueError):
+    """Raised when sections of the resume are still missing after asking the model again."""
+
+
+def _strip_trailing_comma(out):
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    if i >= 0 and out[i] == ',':
+        del out[i]
+
+
+def _scan(text, start):
+    """Return (repaired_text, end, truncated) for the object opening at start."""
+    out = []
+    stack = []
+    in_string = False
+    escape = False
+    # Where the text can be cut if it ends early: (length of out, open brackets)
+    cut = None
+
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in '{[':
+            stack.append(ch)
+            out.append(ch)
+            cut = (len(out), list(stack))
+        elif ch in '}]':
+            _strip_trailing_comma(out)
+            # Close anything the model left open inside this bracket
+            while stack and _CLOSERS[stack[-1]] != ch:
+                out.append(_CLOSERS[stack.pop()])
+            if not stack:
+                # A stray closer after everything was closed ends the object
+                return ''.join(out), i + 1, False
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                return ''.join(out), i + 1, False
+        elif ch == ',':
+            cut = (len(out), list(stack))
+            out.append(ch)
+        else:
+            out.append(ch)
+
+    if cut is None:
+        return None, len(text), True
+    length, open_brackets = cut
+    out = out[:length]
+    _strip_trailing_comma(out)
+    out.extend(_CLOSERS[bracket] for bracket in reversed(open_brackets))
+    return ''.join(out), len(text), True
+
+
+def extract_json_object(text):
+    """Return (obj, truncated) for the first JSON object in text that can be recovered.
+
+    Raises ValueError if there is none.
+    """
+    start = text.find('{')
+    error = None
+    for _ in range(MAX_CANDIDATES):
+        if start == -1:
+            break
+        repaired, end, truncated = _scan(text, start)
+        if repaired is not None:
+            try:
+                obj = json.loads(repaired)
+            except ValueError as e:
+                error = e
+            else:
+                if isinstance(obj, dict):
+                    return obj, truncated
+        if truncated:
+            break
+        start = text.find('{', start + 1)
+    raise ValueError(f"No JSON object found in model response{f': {error}' if error else ''}")
+
+
+def _matches(reference, candidate):
+    if isinstance(reference, dict):
+        return isinstance(candidate, dict) and all(
+            key in candidate and _matches(value, candidate[key]) for key, value in reference.items()
+        )
+    if isinstance(reference, list):
+        if not isinstance(candidate, list):
+            return False
+        if reference and isinstance(reference[0], (dict, list)):
+            # Jobs and skill groups keep their count and shape
+            return len(candidate) == len(reference) and all(
+                _matches(ref, cand) for ref, cand in zip(reference, candidate)
+            )
+        # Keywords may be added, but a shorter list means items were lost
+        return len(candidate) >= len(reference)
+    if isinstance(reference, str):
+        return isinstance(candidate, str)
+    return True
+
+
+def missing_sections(reference, candidate):
+    """Top-level keys of reference that candidate lacks or no longer matches in shape."""
+    return [key for key, value in reference.items()
+            if key not in candidate or not _matches(value, candidate[key])]
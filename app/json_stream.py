@@ -0,0 +1,114 @@
+import json
+
+
+class SectionStreamParser:
+    """Incrementally scan a streamed JSON object and report sections as they close.
+
+    feed() takes the next chunk of model output and returns a list of events:
+
+    - {'key': k, 'index': i, 'value': v} when item i of a top-level array k closes
+    - {'key': k, 'value': v} when top-level field k closes
+
+    Anything before the first '{' (chatter, a ```json fence) is skipped. The
+    scan is a single pass over the text; nothing is re-parsed on later feeds.
+    """
+
+    def __init__(self):
+        self._buf = ''
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._expect_key = False
+        self._key = None
+        self._value_start = None
+        self._item_start = None
+        self._item_index = 0
+        self.done = False
+
+    def feed(self, text):
+        self._buf += text
+        buf = self._buf
+        events = []
+        i = self._pos
+        while i < len(buf) and not self.done:
+            ch = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1 and self._expect_key:
+                        self._key = json.loads(buf[self._string_start:i + 1])
+                i += 1
+                continue
+
+            if not self._stack:
+                # Skip until the outermost object opens
+                if ch == '{':
+                    self._stack.append('{')
+                    self._expect_key = True
+                i += 1
+                continue
+
+            depth = len(self._stack)
+            in_top_array = depth >= 2 and self._stack[1] == '['
+
+            if ch == '"' or ch in '{[' or not (ch.isspace() or ch in ',:}]'):
+                # Start of a value (or of a key at depth 1)
+                if depth == 1 and not self._expect_key and self._value_start is None:
+                    self._value_start = i
+                elif depth == 2 and in_top_array and self._item_start is None:
+                    self._item_start = i
+                if ch == '"':
+                    self._in_string = True
+                    self._string_start = i
+                elif ch in '{[':
+                    self._stack.append(ch)
+            elif ch == ':':
+                if depth == 1:
+                    self._expect_key = False
+            elif ch == ',':
+                if depth == 1:
+                    if self._value_start is not None:
+                        self._emit_field(events, buf[self._value_start:i])
+                    self._expect_key = True
+                elif depth == 2 and in_top_array and self._item_start is not None:
+                    self._emit_item(events, buf[self._item_start:i])
+            elif ch in '}]':
+                if depth == 1:
+                    if self._value_start is not None:
+                        self._emit_field(events, buf[self._value_start:i])
+                    self.done = True
+                elif depth == 2:
+                    if in_top_array and self._item_start is not None:
+                        self._emit_item(events, buf[self._item_start:i])
+                    self._emit_field(events, buf[self._value_start:i + 1])
+                elif depth == 3 and in_top_array:
+                    self._emit_item(events, buf[self._item_start:i + 1])
+                self._stack.pop()
+            i += 1
+
+        self._pos = i
+        return events
+
+    def _emit_field(self, events, text):
+        self._value_start = None
+        self._item_index = 0
+        try:
+            events.append({'key': self._key, 'value': json.loads(text)})
+        except ValueError:
+            pass
+
+    def _emit_item(self, events, text):
+        self._item_start = None
+        index = self._item_index
+        self._item_index += 1
+        try:
+            events.append({'key': self._key, 'index': index, 'value': json.loads(text)})
+        except ValueError:
+            pass
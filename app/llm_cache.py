@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from .storage import PROFILES_DIR
+
+# Directory for cached LLM responses, next to the profile store; empty keeps the cache in memory only
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join(PROFILES_DIR, '.llm_cache'))
+# Seconds a cached response stays valid (default one week)
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+# Least recently used entries are evicted past either limit
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Maximum number of parsed responses also kept in memory
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "128"))
+# Bump when prompts or response handling change so old entries stop matching
+LLM_CACHE_VERSION = 1
+
+_memory = OrderedDict()
+# key -> [size, last_used] for every entry on disk, built on first use
+_index = None
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def normalize_text(text):
+    """Canonical form of free text for cache keys: NFKC, collapsed whitespace."""
+    return ' '.join(unicodedata.normalize('NFKC', text or '').split())
+
+
+def _key(kind, parts):
+    canonical = json.dumps([LLM_CACHE_VERSION, kind, parts], sort_keys=True,
+                           separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def improve_key(model, mode, pre_prompt, post_prompt, additional_context, job_description, resume):
+    """Cache key for an /improve-resume rewrite."""
+    return _key('improve', [model, mode, pre_prompt or '', post_prompt or '', additional_context or '',
+                            normalize_text(job_description), resume])
+
+
+def company_key(job_description):
+    """Cache key for the company name of a job description."""
+    return _key('company', [normalize_text(job_description)])
+
+
+def _disk_path(key):
+    return os.path.join(LLM_CACHE_DIR, f"{key}.json")
+
+
+def _load_index():
+    global _index
+    if _index is not None:
+        return
+    _index = {}
+    if not LLM_CACHE_DIR or not os.path.isdir(LLM_CACHE_DIR):
+        return
+    for entry in os.scandir(LLM_CACHE_DIR):
+        if entry.name.endswith('.json'):
+            stat = entry.stat()
+            _index[entry.name[:-5]] = [stat.st_size, stat.st_mtime]
+
+
+def _expired(created, now):
+    return now - created > LLM_CACHE_TTL
+
+
+def get_cached_response(key):
+    """Return the cached value for key, or None if missing or expired."""
+    now = time.time()
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None and not _expired(entry[0], now):
+            _memory.move_to_end(key)
+            _touch(key, now)
+            _stats['hits'] += 1
+            return entry[1]
+
+    entry = None
+    if LLM_CACHE_DIR:
+        try:
+            with open(_disk_path(key), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+
+    with _lock:
+        if entry is None or _expired(entry['created'], now):
+            _stats['misses'] += 1
+            if entry is not None:
+                _discard(key)
+            return None
+        _stats['hits'] += 1
+        _remember(key, entry['created'], entry['value'])
+        _touch(key, now)
+        return entry['value']
+
+
+def store_cached_response(key, value):
+    """Cache a JSON-serializable value under key and evict past the size limits."""
+    now = time.time()
+    data = json.dumps({'created': now, 'value': value}, ensure_ascii=False).encode('utf-8')
+    with _lock:
+        _remember(key, now, value)
+
+    if not LLM_CACHE_DIR:
+        return
+    os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+    path = _disk_path(key)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+    with _lock:
+        _load_index()
+        _index[key] = [len(data), now]
+        _evict()
+
+
+def clear_llm_cache():
+    """Remove every cached response from memory and disk."""
+    global _index
+    with _lock:
+        _memory.clear()
+        _load_index()
+        for key in list(_index):
+            _discard(key)
+        _index = None
+
+
+def llm_cache_stats():
+    with _lock:
+        _load_index()
+        return {
+            'hits': _stats['hits'],
+            'misses': _stats['misses'],
+            'entries': len(_index) if LLM_CACHE_DIR else len(_memory),
+            'bytes': sum(size for size, _ in _index.values())
+        }
+
+
+def _remember(key, created, value):
+    _memory[key] = (created, value)
+    _memory.move_to_end(key)
+    while len(_memory) > LLM_CACHE_MEMORY_SIZE:
+        _memory.popitem(last=False)
+
+
+def _touch(key, now):
+    # The file mtime doubles as the last-use time so other processes see it too
+    if _index is not None and key in _index:
+        _index[key][1] = now
+    if LLM_CACHE_DIR:
+        try:
+            os.utime(_disk_path(key), (now, now))
+        except OSError:
+            pass
+
+
+def _discard(key):
+    _memory.pop(key, None)
+    if _index is not None:
+        _index.pop(key, None)
+    if LLM_CACHE_DIR:
+        try:
+            os.remove(_disk_path(key))
+        except FileNotFoundError:
+            pass
+
+
+def _evict():
+    total = sum(size for size, _ in _index.values())
+    if len(_index) <= LLM_CACHE_MAX_ENTRIES and total <= LLM_CACHE_MAX_BYTES:
+        return
+    for key, (size, _) in sorted(_index.items(), key=lambda item: item[1][1]):
+        if len(_index) <= LLM_CACHE_MAX_ENTRIES and total <= LLM_CACHE_MAX_BYTES:
+            break
+        total -= size
+        _discard(key)
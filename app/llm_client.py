@@ -0,0 +1,103 @@
+import os
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+# OpenAI-compatible endpoint; point it at a local stub server for tests and benchmarks
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
+# Seconds to wait for a full response / for a connection to open
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+# Retries use the SDK's exponential backoff with jitter
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+# 'auto' enables HTTP/2 when the h2 package is installed
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "auto")
+# Threads available for LLM calls that run alongside the request thread
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "16"))
+
+_client = None
+_client_key = None
+_client_lock = threading.Lock()
+_executor = None
+_encoding = None
+
+
+def _http2_enabled():
+    if LLM_HTTP2 == 'auto':
+        return importlib.util.find_spec('h2') is not None
+    return LLM_HTTP2.lower() in ('1', 'true', 'yes')
+
+
+def _build_client(api_key, base_url):
+    # Imported lazily: the openai package dominates app import time
+    import httpx
+    from openai import OpenAI, DefaultHttpxClient
+
+    timeout = httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+    http_client = DefaultHttpxClient(
+        http2=_http2_enabled(),
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY
+        )
+    )
+    return OpenAI(
+        base_url=base_url,
+        api_key=api_key,
+        http_client=http_client,
+        timeout=timeout,
+        max_retries=LLM_MAX_RETRIES
+    )
+
+
+def get_openai_client():
+    """Process-wide OpenAI client sharing one keep-alive connection pool.
+
+    The client is rebuilt if the API key or base URL changes (for example once
+    secrets.yaml has been loaded).
+    """
+    global _client, _client_key
+    key = (os.getenv("API_KEY"), LLM_BASE_URL)
+    with _client_lock:
+        if _client is None or _client_key != key:
+            _client = _build_client(*key)
+            _client_key = key
+        return _client
+
+
+def reset_openai_client():
+    """Close the shared client; the next call builds a fresh one."""
+    global _client, _client_key
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _client_key = None
+
+
+def submit_llm_call(fn, *args, **kwargs):
+    """Run a blocking LLM call on the shared thread pool and return its Future."""
+    global _executor
+    with _client_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=LLM_CONCURRENCY, thread_name_prefix='llm')
+    return _executor.submit(fn, *args, **kwargs)
+
+
+def count_tokens(text):
+    """Token count of text: exact with tiktoken installed, else about 4 characters per token."""
+    global _encoding
+    if _encoding is None:
+        if importlib.util.find_spec('tiktoken') is not None:
+            import tiktoken
+            _encoding = tiktoken.get_encoding('cl100k_base')
+        else:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
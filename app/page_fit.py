@@ -0,0 +1,194 @@
+"""Tighten a resume's layout until it fits a target number of pages.
+
+The resume's flowables are built once with the base theme and measured with
+wrap(), without drawing anything. Scaling fonts by f, leading by l and
+spacing by s (see pdf_generator.scaled_theme) then changes heights in a way
+that can be computed from those measurements:
+
+- a paragraph wrapped at width w with fonts and indents scaled by f breaks
+  its lines exactly where the unscaled paragraph does at width w / f, and
+  the _ReusableParagraph wrap memo keeps every width already tried;
+- a paragraph's height is lines * leading * f * l, a table row's is the
+  tallest cell plus its top and bottom padding * s;
+- spaceBefore/spaceAfter and the theme's gaps are multiplied by s.
+
+Page counts come from replaying ReportLab's Frame rules (collapsed
+spaceBefore/spaceAfter, no spaceBefore at the top of a frame) over those
+heights. Flowables that would straddle a page break are moved to the next
+page whole, so estimates for more than one page are on the safe side.
+
+Spacing is cut first, then leading, then font size, each within the bounds
+below; whatever is cut last is given back as far as the page allows.
+"""
+import os
+from collections import namedtuple
+
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import Paragraph, Spacer, Table
+
+from .pdf_generator import (
+    build_resume_flowables, DEFAULT_THEME, DEFAULT_LAYOUT, Layout, PAGE_MARGIN
+)
+
+# Lowest factors the optimizer may apply to the theme
+MIN_FONT_SCALE = float(os.getenv("FIT_MIN_FONT_SCALE", "0.85"))
+MIN_LEADING_SCALE = float(os.getenv("FIT_MIN_LEADING_SCALE", "0.9"))
+MIN_SPACING_SCALE = float(os.getenv("FIT_MIN_SPACING_SCALE", "0.4"))
+# Font sizes are tried in steps of this factor; spacing and leading are searched continuously
+FONT_SCALE_STEP = 0.01
+SEARCH_STEPS = 12
+MAX_FIT_PAGES = 10
+
+# ReportLab frames pad their content by 6pt on every side
+FRAME_PADDING = 6
+FRAME_WIDTH = letter[0] - 2 * PAGE_MARGIN - 2 * FRAME_PADDING
+FRAME_HEIGHT = letter[1] - 2 * PAGE_MARGIN - 2 * FRAME_PADDING
+# Same tolerance Frame uses when deciding whether a flowable fits
+_FUZZ = 1e-6
+
+PageFit = namedtuple('PageFit', ['fits', 'pages', 'target', 'layout'])
+
+# One text cell: the paragraph, the width it is wrapped to, its leading and
+# the width of padding that scales with the font
+_Cell = namedtuple('_Cell', ['paragraph', 'width', 'leading', 'padding'])
+# A flowable: fixed rows in points, spacing-scaled points, and text rows
+# where each row is [(cell, vertical padding), ...]
+_Block = namedtuple('_Block', ['space_before', 'space_after', 'fixed', 'spacing', 'rows'])
+
+
+def _measure(flowable):
+    if isinstance(flowable, Paragraph):
+        cell = _Cell(flowable, FRAME_WIDTH, flowable.style.leading, 0)
+        return _Block(flowable.style.spaceBefore, flowable.style.spaceAfter, 0, 0, [[(cell, 0)]])
+    if isinstance(flowable, Spacer):
+        # The theme's gaps are the only spacers in the layout
+        return _Block(0, 0, 0, flowable.height, [])
+    if isinstance(flowable, Table):
+        fixed = 0
+        rows = []
+        for i, (values, styles) in enumerate(zip(flowable._cellvalues, flowable._cellStyles)):
+            if flowable._argH[i] is not None:
+                fixed += flowable._argH[i]
+                continue
+            row = []
+            for value, style, width in zip(values, styles, flowable._argW):
+                if isinstance(value, Paragraph):
+                    cell = _Cell(value, width, value.style.leading, style.leftPadding + style.rightPadding)
+                    row.append((cell, style.topPadding + style.bottomPadding))
+            rows.append(row)
+        return _Block(flowable.getSpaceBefore(), flowable.getSpaceAfter(), fixed, 0, rows)
+    raise TypeError(f"Cannot measure {flowable.__class__.__name__}")
+
+
+def measure_resume(full_resume, theme=None):
+    """Measurements of a merged resume under its base theme, reusable across searches."""
+    return [_measure(flowable) for flowable in build_resume_flowables(full_resume, theme or DEFAULT_THEME)]
+
+
+def _line_counts(blocks, font_scale):
+    """Lines per text cell at font_scale, from wraps at the equivalent unscaled width."""
+    counts = {}
+    for block in blocks:
+        for row in block.rows:
+            for cell, _ in row:
+                width = cell.width / font_scale - cell.padding
+                _, height = cell.paragraph.wrap(width, FRAME_HEIGHT)
+                counts[id(cell)] = round(height / cell.leading) if cell.leading else 0
+    return counts
+
+
+def _heights(blocks, counts, layout):
+    font, leading, spacing = layout
+    heights = []
+    for block in blocks:
+        height = block.fixed + block.spacing * spacing
+        for row in block.rows:
+            height += max([counts[id(cell)] * cell.leading * font * leading + padding * spacing
+                           for cell, padding in row] or [0])
+        heights.append(height)
+    return heights
+
+
+def _page_count(blocks, heights, spacing_scale):
+    """Pages the blocks take, following Frame._add with overlapAttachedSpace."""
+    pages = 1
+    y = FRAME_HEIGHT
+    previous_after = 0
+    at_top = True
+    for block, height in zip(blocks, heights):
+        before = 0 if at_top else max(block.space_before * spacing_scale - previous_after, 0)
+        if not at_top and (y - before <= 0 or y - before - height < -_FUZZ):
+            pages += 1
+            y = FRAME_HEIGHT
+            at_top = True
+            before = 0
+        after = block.space_after * spacing_scale
+        y -= before + height + after
+        previous_after = after
+        if before + height + after:
+            at_top = False
+    return pages
+
+
+def _largest(fits, low, high):
+    """Largest value in [low, high] that fits, given that low does."""
+    if fits(high):
+        return high
+    for _ in range(SEARCH_STEPS):
+        middle = (low + high) / 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle
+    # Round down so the reported layout is never looser than the one tested
+    return int(low * 1000) / 1000
+
+
+def fit_layout(full_resume, pages=1, theme=None, blocks=None):
+    """Find the loosest Layout (within the MIN_* bounds) that fits full_resume on `pages` pages.
+
+    Returns a PageFit; if even the tightest layout does not fit, fits is
+    False and layout is that tightest layout. Pass `blocks` from
+    measure_resume() to skip building the flowables.
+    """
+    if blocks is None:
+        blocks = measure_resume(full_resume, theme)
+    line_counts = {}
+
+    def count_pages(layout):
+        font = layout.font_scale
+        if font not in line_counts:
+            line_counts[font] = _line_counts(blocks, font)
+        return _page_count(blocks, _heights(blocks, line_counts[font], layout), layout.spacing_scale)
+
+    def fits(layout):
+        return count_pages(layout) <= pages
+
+    if fits(DEFAULT_LAYOUT):
+        return PageFit(True, count_pages(DEFAULT_LAYOUT), pages, DEFAULT_LAYOUT)
+
+    # Largest font that fits with leading and spacing fully tightened
+    steps = int(round((1 - MIN_FONT_SCALE) / FONT_SCALE_STEP))
+    fonts = [round(1 - i * FONT_SCALE_STEP, 3) for i in range(steps + 1)]
+    tightest = Layout(fonts[-1], MIN_LEADING_SCALE, MIN_SPACING_SCALE)
+    if not fits(tightest):
+        return PageFit(False, count_pages(tightest), pages, tightest)
+    low, high = 0, len(fonts) - 1
+    while low < high:
+        middle = (low + high) // 2
+        if fits(Layout(fonts[middle], MIN_LEADING_SCALE, MIN_SPACING_SCALE)):
+            high = middle
+        else:
+            low = middle + 1
+    font = fonts[low]
+
+    # Then give back as much leading, and after that spacing, as still fits
+    leading = _largest(lambda value: fits(Layout(font, value, MIN_SPACING_SCALE)), MIN_LEADING_SCALE, 1.0)
+    spacing = _largest(lambda value: fits(Layout(font, leading, value)), MIN_SPACING_SCALE, 1.0)
+    layout = Layout(font, leading, spacing)
+    return PageFit(True, count_pages(layout), pages, layout)
+
+
+def fit_summary(fit):
+    """JSON-friendly form of a PageFit."""
+    return {'fits': fit.fits, 'pages': fit.pages, 'target': fit.target, **fit.layout._asdict()}
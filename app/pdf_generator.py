@@ -1,10 +1,19 @@
+import copy
 import json
+import pickle
+import hashlib
+import threading
+from functools import lru_cache
+from collections import namedtuple, OrderedDict
+from weakref import WeakKeyDictionary
+
+import reportlab
 
 from reportlab.lib.enums import TA_LEFT, TA_RIGHT
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Flowable
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
@@ -16,285 +25,549 @@ fonts_dir = os.path.join(base_dir, "fonts")
 
 avenir = "Avenir"
 avenir_path = os.path.join(fonts_dir, "Avenir Next.ttc")
-if os.path.exists(avenir_path):
-    pdfmetrics.registerFont(TTFont(avenir, avenir_path))
-else:
-    # Fallback or warning
-    print(f"Warning: Font not found at {avenir_path}")
 
 work_sans = "work_sans"
 work_sans_path = os.path.join(fonts_dir, "WorkSans-Regular.ttf")
-if os.path.exists(work_sans_path):
-    pdfmetrics.registerFont(TTFont(work_sans, work_sans_path))
 
 work_sans_bold = "work_sans_bold"
 work_sans_bold_path = os.path.join(fonts_dir, "WorkSans-Bold.ttf")
-if os.path.exists(work_sans_bold_path):
-    pdfmetrics.registerFont(TTFont(work_sans_bold, work_sans_bold_path))
 
 work_sans_italic = "work_sans_italic"
 work_sans_italic_path = os.path.join(fonts_dir, "WorkSans-Italic.ttf")
-if os.path.exists(work_sans_italic_path):
-    pdfmetrics.registerFont(TTFont(work_sans_italic, work_sans_italic_path))
 
-def generate_reduced_top_margin_resume(buffer, resume):
-    # Load JSON data
-    resume_data = resume
+FONTS = [
+    (avenir, avenir_path),
+    (work_sans, work_sans_path),
+    (work_sans_bold, work_sans_bold_path),
+    (work_sans_italic, work_sans_italic_path),
+]
 
-    # Define colors
-    dark_blue = colors.HexColor('#2C3E50')
-    dark_gray = colors.HexColor('#555555')
-    
-    # Define styles
-    styles = getSampleStyleSheet()
-    
-    # Header Styles
-    header_style = ParagraphStyle(
-        'HeaderStyle',
-        parent=styles['Heading1'],
-        fontName=avenir,
-        fontSize=24,
-        textColor=dark_blue,
-        alignment=1, # Center
-        spaceAfter=10
-    )
+# Optional directory for pre-parsed font metrics; unset means always parse the TTF files
+FONT_CACHE_DIR = os.getenv("FONT_CACHE_DIR")
 
-    contact_style = ParagraphStyle(
-        'ContactStyle',
-        parent=styles['Normal'],
-        fontName=work_sans,
-        fontSize=10,
-        textColor=dark_gray,
-        alignment=1, # Center
-        spaceAfter=20
-    )
+_fonts_registered = False
+_fonts_lock = threading.Lock()
 
-    # Section Header Style
-    section_header_style = ParagraphStyle(
-        'SectionHeaderStyle',
-        parent=styles['Heading2'],
-        fontName=work_sans_bold,
-        fontSize=11,
-        textColor=colors.black,
-        textTransform='uppercase',
-        spaceBefore=12,
-        spaceAfter=3,
-        borderWidth=0,
-        leftIndent=0
-    )
+def register_fonts():
+    """Parse and register the TTF fonts on first use. Later calls return immediately."""
+    global _fonts_registered
+    if _fonts_registered:
+        return
+    with _fonts_lock:
+        if _fonts_registered:
+            return
+        for name, path in FONTS:
+            if os.path.exists(path):
+                pdfmetrics.registerFont(_load_ttfont(name, path))
+            elif name == avenir:
+                # Fallback or warning
+                print(f"Warning: Font not found at {path}")
+        _fonts_registered = True
 
-    # Content Styles
-    body_style = ParagraphStyle(
-        'BodyText',
-        parent=styles['Normal'],
-        fontSize=10,
-        fontName=work_sans,
-        leading=12,
-        spaceAfter=2,
-        leftIndent=0
-    )
-    
-    company_style = ParagraphStyle(
-        'CompanyStyle',
-        parent=body_style,
-        fontName=work_sans_bold,
-        fontSize=11,
-        textColor=colors.black,
-        leftIndent=7,
-        spaceAfter=0
-    )
-    
-    position_style = ParagraphStyle(
-        'PositionStyle',
-        parent=body_style,
-        fontName=work_sans_italic,
-        fontSize=10,
-        textColor=colors.black,
-        leftIndent=7,
-        spaceAfter=2
-    )
-    
-    date_location_style = ParagraphStyle(
-        'DateLocationStyle',
-        parent=body_style,
-        fontName=work_sans,
-        fontSize=10,
-        textColor=colors.black,
-        alignment=TA_RIGHT
-    )
-    
-    bullet_style = ParagraphStyle(
-        'BulletStyle',
-        parent=body_style,
-        fontName=work_sans,
-        fontSize=10,
-        leftIndent=18,
-        firstLineIndent=0,
-        spaceAfter=2,
-        bulletIndent=5
+def _font_cache_path(path):
+    stat = os.stat(path)
+    base = os.path.basename(path).replace(' ', '_')
+    return os.path.join(
+        FONT_CACHE_DIR,
+        f"{base}-{stat.st_size}-{int(stat.st_mtime)}-rl{reportlab.Version}.pickle"
     )
 
-    skill_category_style = ParagraphStyle(
-        'SkillCategory',
-        parent=body_style,
-        fontName=work_sans_bold,
-        fontSize=10,
-        leftIndent=7
-    )
-    
-    skill_keywords_style = ParagraphStyle(
-        'SkillKeywords',
-        parent=body_style,
-        fontName=work_sans,
-        fontSize=10,
-        leftIndent=0
+def _load_ttfont(name, path):
+    """Build a TTFont, going through the on-disk metrics cache when FONT_CACHE_DIR is set."""
+    if not FONT_CACHE_DIR:
+        return TTFont(name, path)
+
+    cache_path = _font_cache_path(path)
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                font = pickle.load(f)
+            # Restore the pieces that cannot be pickled
+            units_per_em = font.face.unitsPerEm
+            if units_per_em == 1000:
+                font.face._pdfScale = lambda x: x
+            else:
+                font.face._pdfScale = lambda x: x * 1000 / units_per_em
+            font.state = WeakKeyDictionary()
+            font.fontName = name
+            return font
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable font cache {cache_path}: {e}")
+
+    font = TTFont(name, path)
+    try:
+        os.makedirs(FONT_CACHE_DIR, exist_ok=True)
+        scale, state = font.face._pdfScale, font.state
+        del font.face._pdfScale
+        font.state = None
+        try:
+            data = pickle.dumps(font, protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            font.face._pdfScale, font.state = scale, state
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"Warning: Could not write font cache {cache_path}: {e}")
+    return font
+
+# Bump whenever the layout below or a template spec changes so cached renders are invalidated
+TEMPLATE_VERSION = 1
+
+def _font_fingerprint():
+    """Identify the installed font files so swapping a font busts the render cache."""
+    parts = []
+    for _, path in FONTS:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            parts.append(f"{os.path.basename(path)}:{stat.st_size}:{int(stat.st_mtime)}")
+    return "|".join(parts)
+
+RENDER_VERSION = f"{TEMPLATE_VERSION}/{_font_fingerprint()}"
+
+# Page margins in points, the same on every side
+PAGE_MARGIN = 0.35*72
+# The content area is 8.5" - 0.35" - 0.35" = 7.8"
+CONTENT_WIDTH = 7.8*72
+
+Theme = namedtuple('Theme', [
+    'header', 'contact', 'section_header', 'body', 'company', 'position',
+    'date_location', 'bullet', 'skill_category', 'skill_keywords',
+    'separator_table', 'skill_table', 'job_table', 'edu_table',
+    # Vertical gaps in points: after section headings, after a job's header
+    # rows, after each job and after each education entry
+    'section_gap', 'job_header_gap', 'job_gap', 'edu_gap',
+    # Column widths in points of the two-column skill, job and education rows
+    'skill_columns', 'job_columns', 'edu_columns',
+    # Resume sections in page order, see SECTIONS
+    'sections',
+])
+
+# Gap fields, the only plain numbers scaled_theme() adjusts
+GAP_FIELDS = ('section_gap', 'job_header_gap', 'job_gap', 'edu_gap')
+
+# Sections a template can place, each built from one part of the resume
+SECTIONS = ('header', 'summary', 'skills', 'work', 'education')
+
+# The original layout, as a template spec (see compile_theme and
+# resume_templates). Paragraph styles take ParagraphStyle keywords; `parent`
+# names a style declared earlier or one of ReportLab's sample styles, and
+# colors are names or hex strings. Table paddings are (top, right, bottom,
+# left) and column widths are in inches.
+CLASSIC_TEMPLATE = {
+    'name': 'classic',
+    'description': 'Centered header, skills before experience',
+    'sections': ['header', 'summary', 'skills', 'work', 'education'],
+    'styles': {
+        'header': {'parent': 'Heading1', 'fontName': avenir, 'fontSize': 24,
+                   'textColor': '#2C3E50', 'alignment': 1, 'spaceAfter': 10},
+        'contact': {'parent': 'Normal', 'fontName': work_sans, 'fontSize': 10,
+                    'textColor': '#555555', 'alignment': 1, 'spaceAfter': 20},
+        'section_header': {'parent': 'Heading2', 'fontName': work_sans_bold, 'fontSize': 11,
+                           'textColor': 'black', 'textTransform': 'uppercase',
+                           'spaceBefore': 12, 'spaceAfter': 3, 'borderWidth': 0, 'leftIndent': 0},
+        'body': {'parent': 'Normal', 'fontSize': 10, 'fontName': work_sans, 'leading': 12,
+                 'spaceAfter': 2, 'leftIndent': 0},
+        'company': {'parent': 'body', 'fontName': work_sans_bold, 'fontSize': 11,
+                    'textColor': 'black', 'leftIndent': 7, 'spaceAfter': 0},
+        'position': {'parent': 'body', 'fontName': work_sans_italic, 'fontSize': 10,
+                     'textColor': 'black', 'leftIndent': 7, 'spaceAfter': 2},
+        'date_location': {'parent': 'body', 'fontName': work_sans, 'fontSize': 10,
+                          'textColor': 'black', 'alignment': TA_RIGHT},
+        'bullet': {'parent': 'body', 'fontName': work_sans, 'fontSize': 10, 'leftIndent': 18,
+                   'firstLineIndent': 0, 'spaceAfter': 2, 'bulletIndent': 5},
+        'skill_category': {'parent': 'body', 'fontName': work_sans_bold, 'fontSize': 10, 'leftIndent': 7},
+        'skill_keywords': {'parent': 'body', 'fontName': work_sans, 'fontSize': 10, 'leftIndent': 0},
+    },
+    'tables': {
+        'separator_table': {'background': 'black', 'padding': (0, 0, 0, 0)},
+        'skill_table': {'valign': 'TOP', 'padding': (0, 0, 2, 0)},
+        'job_table': {'valign': 'TOP', 'padding': (0, 0, 0, 0)},
+        # Education rows use the same padding as skill rows
+        'edu_table': {'valign': 'TOP', 'padding': (0, 0, 2, 0)},
+    },
+    'gaps': {'section_gap': 8, 'job_header_gap': 4, 'job_gap': 12, 'edu_gap': 6},
+    'columns': {
+        'skill_columns': (1.8, 6.0),
+        'job_columns': (5.5, 2.3),
+        'edu_columns': (6.0, 1.8),
+    },
+}
+
+def _paragraph_styles(spec):
+    sample = getSampleStyleSheet()
+    styles = {}
+    for field, options in spec.items():
+        options = dict(options)
+        parent = options.pop('parent', 'Normal')
+        parent = styles[parent] if parent in styles else sample[parent]
+        if 'textColor' in options:
+            options['textColor'] = colors.toColor(options['textColor'])
+        styles[field] = ParagraphStyle(field, parent=parent, **options)
+    return styles
+
+def _table_style(spec):
+    top, right, bottom, left = spec.get('padding', (0, 0, 0, 0))
+    commands = []
+    if 'background' in spec:
+        commands.append(('BACKGROUND', (0, 0), (-1, -1), colors.toColor(spec['background'])))
+    if 'valign' in spec:
+        commands.append(('VALIGN', (0, 0), (-1, -1), spec['valign']))
+    commands += [
+        ('TOPPADDING', (0, 0), (-1, -1), top),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), bottom),
+        ('LEFTPADDING', (0, 0), (-1, -1), left),
+        ('RIGHTPADDING', (0, 0), (-1, -1), right),
+    ]
+    return TableStyle(commands)
+
+def compile_theme(spec):
+    """Build every style a template spec describes. Done once per template; renders share the result."""
+    unknown = [name for name in spec['sections'] if name not in SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown resume sections: {', '.join(unknown)}")
+    for field, widths in spec['columns'].items():
+        if abs(sum(widths) * 72 - CONTENT_WIDTH) > 0.01:
+            raise ValueError(f"{field} must add up to the {CONTENT_WIDTH / 72:g}\" content width")
+    return Theme(
+        **_paragraph_styles(spec['styles']),
+        **{field: _table_style(table) for field, table in spec['tables'].items()},
+        **spec['gaps'],
+        **{field: tuple(width*72 for width in widths) for field, widths in spec['columns'].items()},
+        sections=tuple(spec['sections']),
     )
 
-    # Define line separator for headers (width matches content area: 8.5" - 0.35" - 0.35" = 7.8")
-    line_separator = Table([[""]],colWidths=[7.8*72], rowHeights=[0.5])
-    line_separator.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), colors.black),
-        ("TOPPADDING", (0, 0), (-1, -1), 0),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 0),
-        ("LEFTPADDING", (0, 0), (-1, -1), 0),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 0),
-    ]))
+def _build_theme():
+    return compile_theme(CLASSIC_TEMPLATE)
 
-    # Create PDF document with minimal margins for maximum content
-    doc = SimpleDocTemplate(
-        buffer, 
-        pagesize=letter, 
-        rightMargin=0.35*72, 
-        leftMargin=0.35*72, 
-        topMargin=0.35*72, 
-        bottomMargin=0.35*72
+DEFAULT_THEME = _build_theme()
+
+# How much a theme is tightened: font sizes (with indents), line leading and
+# vertical spacing, each as a factor of the theme's own value
+Layout = namedtuple('Layout', ['font_scale', 'leading_scale', 'spacing_scale'])
+DEFAULT_LAYOUT = Layout(1.0, 1.0, 1.0)
+
+def _scaled_style(style, layout):
+    font, leading, spacing = layout
+    # Indents follow the font so a line holds the same text at any font scale
+    return ParagraphStyle(
+        style.name,
+        parent=style,
+        fontSize=style.fontSize * font,
+        leading=style.leading * font * leading,
+        leftIndent=style.leftIndent * font,
+        rightIndent=style.rightIndent * font,
+        firstLineIndent=style.firstLineIndent * font,
+        bulletIndent=style.bulletIndent * font,
+        bulletFontSize=style.bulletFontSize * font,
+        spaceBefore=style.spaceBefore * spacing,
+        spaceAfter=style.spaceAfter * spacing
     )
-    content_elements = []
 
-    # --- Header Section ---
-    content_elements.append(Paragraph(resume_data["basics"]["name"], header_style))
-    
+def _scaled_table_style(table_style, layout):
+    factors = {
+        'TOPPADDING': layout.spacing_scale,
+        'BOTTOMPADDING': layout.spacing_scale,
+        'LEFTPADDING': layout.font_scale,
+        'RIGHTPADDING': layout.font_scale,
+    }
+    commands = []
+    for command in table_style.getCommands():
+        if command[0] in factors:
+            command = tuple(command[:3]) + (command[3] * factors[command[0]],)
+        commands.append(command)
+    return TableStyle(commands)
+
+@lru_cache(maxsize=64)
+def scaled_theme(layout, theme=None):
+    """theme (the default theme if None) tightened by a Layout.
+
+    Cached, so renders with the same layout share one theme object and with
+    it the section cache.
+    """
+    if theme is None:
+        theme = DEFAULT_THEME
+    layout = Layout(*layout)
+    if layout == DEFAULT_LAYOUT:
+        return theme
+    scaled = {}
+    for field, value in theme._asdict().items():
+        if isinstance(value, ParagraphStyle):
+            scaled[field] = _scaled_style(value, layout)
+        elif isinstance(value, TableStyle):
+            scaled[field] = _scaled_table_style(value, layout)
+        elif field in GAP_FIELDS:
+            scaled[field] = value * layout.spacing_scale
+        else:
+            scaled[field] = value
+    return Theme(**scaled)
+
+# Parsed and wrapped flowables kept per section; see _section()
+SECTION_CACHE_SIZE = int(os.getenv("SECTION_CACHE_SIZE", "512"))
+
+_section_cache = OrderedDict()
+_section_cache_lock = threading.Lock()
+_section_stats = {'hits': 0, 'misses': 0}
+
+class _ReusableParagraph(Paragraph):
+    """Paragraph whose line breaks are computed once per width.
+
+    Copies made by _clone share the memo, so a paragraph parsed for one
+    render is laid out without re-running breakLines in later renders.
+    """
+
+    def __init__(self, text, style, *args, **kwargs):
+        Paragraph.__init__(self, text, style, *args, **kwargs)
+        self._wraps = {}
+
+    def wrap(self, availWidth, availHeight):
+        wrapped = self._wraps.get(availWidth)
+        if wrapped is None:
+            Paragraph.wrap(self, availWidth, availHeight)
+            self._wraps[availWidth] = (self.width, self.height, self.blPara, self._wrapWidths)
+        else:
+            self.width, self.height, self.blPara, self._wrapWidths = wrapped
+        return self.width, self.height
+
+def _clone(flowable):
+    """Per-render copy of a cached flowable.
+
+    Drawing sets attributes on the flowable (e.g. its canvas), so concurrent
+    renders must not share instances; parsed text and wrap memos are shared.
+    """
+    clone = copy.copy(flowable)
+    if isinstance(flowable, Table):
+        clone._cellvalues = [
+            [_clone(value) if isinstance(value, Flowable) else value for value in row]
+            for row in flowable._cellvalues
+        ]
+    return clone
+
+def _theme_fingerprint(theme):
+    """Resolved style values, so equal themes share cached sections."""
+    parts = []
+    for value in theme:
+        if isinstance(value, ParagraphStyle):
+            parts.append([repr(getattr(value, name, None)) for name in sorted(value.defaults)])
+        elif isinstance(value, TableStyle):
+            parts.append(repr(value.getCommands()))
+        else:
+            parts.append(repr(value))
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+# Fingerprints of recently used themes by id; the entry keeps the theme alive so the id stays valid
+_theme_keys = OrderedDict()
+THEME_KEY_CACHE_SIZE = 16
+
+def _theme_key(theme):
+    with _section_cache_lock:
+        entry = _theme_keys.get(id(theme))
+        if entry is not None and entry[0] is theme:
+            _theme_keys.move_to_end(id(theme))
+            return entry[1]
+    key = _theme_fingerprint(theme)
+    with _section_cache_lock:
+        _theme_keys[id(theme)] = (theme, key)
+        while len(_theme_keys) > THEME_KEY_CACHE_SIZE:
+            _theme_keys.popitem(last=False)
+    return key
+
+def _section(kind, content, theme, build):
+    """Flowables for one section, rebuilt only when its content or the theme changes."""
+    canonical = json.dumps([kind, content], sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    key = hashlib.sha256(f"{_theme_key(theme)}\0{canonical}".encode('utf-8')).hexdigest()
+    with _section_cache_lock:
+        flowables = _section_cache.get(key)
+        if flowables is not None:
+            _section_cache.move_to_end(key)
+            _section_stats['hits'] += 1
+        else:
+            _section_stats['misses'] += 1
+    if flowables is None:
+        flowables = build(content, theme)
+        with _section_cache_lock:
+            _section_cache[key] = flowables
+            while len(_section_cache) > SECTION_CACHE_SIZE:
+                _section_cache.popitem(last=False)
+    return [_clone(flowable) for flowable in flowables]
+
+def section_cache_stats():
+    with _section_cache_lock:
+        return dict(_section_stats, entries=len(_section_cache))
+
+def clear_section_cache():
+    with _section_cache_lock:
+        _section_cache.clear()
+
+def _line_separator(theme):
+    line_separator = Table([[""]], colWidths=[CONTENT_WIDTH], rowHeights=[0.5])
+    line_separator.setStyle(theme.separator_table)
+    return line_separator
+
+def _row_table(data, col_widths, table_style):
+    table = Table(data, colWidths=list(col_widths))
+    table.setStyle(table_style)
+    return table
+
+# --- Section builders: content -> flowables ---
+
+def _build_heading(title, theme):
+    return [
+        _ReusableParagraph(title, theme.section_header),
+        _line_separator(theme),
+        Spacer(1, theme.section_gap),
+    ]
+
+def _build_header(basics, theme):
     # Construct contact info line
     contact_parts = []
-    if resume_data['basics'].get('location', {}).get('address'):
-        contact_parts.append(resume_data['basics']['location']['address'])
-    if resume_data['basics'].get('email'):
-        contact_parts.append(resume_data['basics']['email'])
-    if resume_data['basics'].get('phone'):
-        contact_parts.append(resume_data['basics']['phone'])
-    if resume_data['basics'].get('url'): # Assuming website/portfolio might be in basics
-         contact_parts.append(resume_data['basics']['url'])
+    if basics.get('location', {}).get('address'):
+        contact_parts.append(basics['location']['address'])
+    if basics.get('email'):
+        contact_parts.append(basics['email'])
+    if basics.get('phone'):
+        contact_parts.append(basics['phone'])
+    if basics.get('url'): # Assuming website/portfolio might be in basics
+         contact_parts.append(basics['url'])
 
     contact_line = " | ".join(contact_parts)
-    content_elements.append(Paragraph(contact_line, contact_style))
-    
-    # --- Professional Summary ---
+    return [
+        _ReusableParagraph(basics["name"], theme.header),
+        _ReusableParagraph(contact_line, theme.contact),
+    ]
+
+def _build_summary(summary, theme):
+    return _build_heading("Professional Summary", theme) + [_ReusableParagraph(summary, theme.body)]
+
+def _build_skills(skills, theme):
+    elements = _build_heading("Skills", theme)
+    for skill in skills:
+        # Use a table for better alignment of category vs keywords
+        # Check if keywords is a list or string
+        keywords = skill.get('keywords', [])
+        if isinstance(keywords, list):
+            keywords_str = ", ".join(keywords)
+        else:
+            keywords_str = str(keywords)
+
+        skill_data = [
+            [_ReusableParagraph(f"{skill.get('name', '')}:", theme.skill_category),
+             _ReusableParagraph(keywords_str, theme.skill_keywords)]
+        ]
+
+        elements.append(_row_table(skill_data, theme.skill_columns, theme.skill_table))
+    return elements
+
+def _build_highlight(highlight, theme):
+    # Use a bullet character
+    return [_ReusableParagraph(f"• {highlight}", theme.bullet)]
+
+def _build_job(work, theme):
+    # Company and Location line
+    company_name = work.get("company", "")
+    location = work.get("location", "")
+
+    # Position and Dates line
+    position = work.get("position", "")
+    dates = f"{work.get('startDate', '')} - {work.get('endDate', '')}"
+
+    # Create a table for the header of each job entry to handle alignment
+    job_header_data = [
+        [_ReusableParagraph(company_name, theme.company), _ReusableParagraph(location, theme.date_location)],
+        [_ReusableParagraph(position, theme.position), _ReusableParagraph(dates, theme.date_location)]
+    ]
+
+    elements = [_row_table(job_header_data, theme.job_columns, theme.job_table), Spacer(1, theme.job_header_gap)]
+
+    # Highlights, cached one by one so editing a bullet re-parses only that bullet
+    if work.get("highlights"):
+        for highlight in work["highlights"]:
+            if highlight:
+                elements += _section('highlight', highlight, theme, _build_highlight)
+
+    elements.append(Spacer(1, theme.job_gap)) # Space between jobs
+    return elements
+
+def _build_education(education, theme):
+    elements = _build_heading("Education", theme)
+    for edu in education:
+        institution = edu.get("institution", "")
+        location = edu.get("location", "")
+        dates = f"{edu.get('startDate', '')} - {edu.get('endDate', '')}"
+        degree_info = f"{edu.get('studyType', '')} {edu.get('area', '')}"
+        if edu.get('gpa'):
+            degree_info += f" | GPA: {edu['gpa']}"
+
+        edu_data = [
+            [_ReusableParagraph(institution, theme.company), _ReusableParagraph(dates, theme.date_location)],
+            [_ReusableParagraph(degree_info, theme.position), _ReusableParagraph(location, theme.date_location)]
+        ]
+
+        elements.append(_row_table(edu_data, theme.edu_columns, theme.edu_table))
+        elements.append(Spacer(1, theme.edu_gap))
+    return elements
+
+def _header_flowables(resume_data, theme):
+    return _section('header', resume_data["basics"], theme, _build_header)
+
+def _summary_flowables(resume_data, theme):
     if "professional_summary" in resume_data and resume_data["professional_summary"]:
-        content_elements.append(Paragraph("Professional Summary", section_header_style))
-        content_elements.append(line_separator)
-        content_elements.append(Spacer(1, 8))
-        content_elements.append(Paragraph(resume_data["professional_summary"], body_style))
+        return _section('summary', resume_data["professional_summary"], theme, _build_summary)
+    return []
 
-    # --- Skills Section ---
+def _skills_flowables(resume_data, theme):
     if "skills" in resume_data and resume_data["skills"]:
-        content_elements.append(Paragraph("Skills", section_header_style))
-        content_elements.append(line_separator)
-        content_elements.append(Spacer(1, 8))
-        
-        for skill in resume_data["skills"]:
-            # Use a table for better alignment of category vs keywords
-            # Check if keywords is a list or string
-            keywords = skill.get('keywords', [])
-            if isinstance(keywords, list):
-                keywords_str = ", ".join(keywords)
-            else:
-                keywords_str = str(keywords)
-
-            skill_data = [
-                [Paragraph(f"{skill.get('name', '')}:", skill_category_style),
-                 Paragraph(keywords_str, skill_keywords_style)]
-            ]
-            
-            skill_table = Table(skill_data, colWidths=[1.8*72, 6.0*72])
-            skill_table.setStyle(TableStyle([
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-                ('TOPPADDING', (0, 0), (-1, -1), 0),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ]))
-            content_elements.append(skill_table)
-
-    # --- Experience Section ---
-    if "work" in resume_data and resume_data["work"]:
-        content_elements.append(Paragraph("Experience", section_header_style))
-        content_elements.append(line_separator)
-        content_elements.append(Spacer(1, 8))
+        return _section('skills', resume_data["skills"], theme, _build_skills)
+    return []
 
+def _work_flowables(resume_data, theme):
+    # Each job is its own section, so editing one highlight rebuilds one job
+    elements = []
+    if "work" in resume_data and resume_data["work"]:
+        elements += _section('heading', "Experience", theme, _build_heading)
         for work in resume_data["work"]:
-            # Company and Location line
-            company_name = work.get("company", "")
-            location = work.get("location", "")
-            
-            # Position and Dates line
-            position = work.get("position", "")
-            dates = f"{work.get('startDate', '')} - {work.get('endDate', '')}"
-
-            # Create a table for the header of each job entry to handle alignment
-            job_header_data = [
-                [Paragraph(company_name, company_style), Paragraph(location, date_location_style)],
-                [Paragraph(position, position_style), Paragraph(dates, date_location_style)]
-            ]
-            
-            job_header_table = Table(job_header_data, colWidths=[5.5*72, 2.3*72])
-            job_header_table.setStyle(TableStyle([
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-                ('TOPPADDING', (0, 0), (-1, -1), 0),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-            ]))
-            content_elements.append(job_header_table)
-            content_elements.append(Spacer(1, 4))
-
-            # Highlights
-            if work.get("highlights"):
-                for highlight in work["highlights"]:
-                    if highlight:
-                        # Use a bullet character
-                        content_elements.append(Paragraph(f"• {highlight}", bullet_style))
-            
-            content_elements.append(Spacer(1, 12)) # Space between jobs
-
-    # --- Education Section ---
+            elements += _section('job', work, theme, _build_job)
+    return elements
+
+def _education_flowables(resume_data, theme):
     if "education" in resume_data and resume_data["education"]:
-        content_elements.append(Paragraph("Education", section_header_style))
-        content_elements.append(line_separator)
-        content_elements.append(Spacer(1, 8))
-        
-        for edu in resume_data["education"]:
-            institution = edu.get("institution", "")
-            location = edu.get("location", "")
-            dates = f"{edu.get('startDate', '')} - {edu.get('endDate', '')}"
-            degree_info = f"{edu.get('studyType', '')} {edu.get('area', '')}"
-            if edu.get('gpa'):
-                degree_info += f" | GPA: {edu['gpa']}"
-
-            edu_data = [
-                [Paragraph(institution, company_style), Paragraph(dates, date_location_style)],
-                [Paragraph(degree_info, position_style), Paragraph(location, date_location_style)]
-            ]
-            
-            edu_table = Table(edu_data, colWidths=[6.0*72, 1.8*72])
-            edu_table.setStyle(TableStyle([
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-                ('TOPPADDING', (0, 0), (-1, -1), 0),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ]))
-            content_elements.append(edu_table)
-            content_elements.append(Spacer(1, 6))
+        return _section('education', resume_data["education"], theme, _build_education)
+    return []
+
+_SECTION_FLOWABLES = {
+    'header': _header_flowables,
+    'summary': _summary_flowables,
+    'skills': _skills_flowables,
+    'work': _work_flowables,
+    'education': _education_flowables,
+}
+
+def build_resume_flowables(resume_data, theme=None):
+    """The resume's flowables in the theme's section order, each served from the section cache when unchanged."""
+    register_fonts()
+    if theme is None:
+        theme = DEFAULT_THEME
+
+    content_elements = []
+    for name in theme.sections:
+        content_elements += _SECTION_FLOWABLES[name](resume_data, theme)
+    return content_elements
+
+def resume_doc_template(buffer):
+    # Create PDF document with minimal margins for maximum content
+    return SimpleDocTemplate(
+        buffer, 
+        pagesize=letter, 
+        rightMargin=PAGE_MARGIN, 
+        leftMargin=PAGE_MARGIN, 
+        topMargin=PAGE_MARGIN, 
+        bottomMargin=PAGE_MARGIN
+    )
+
+def generate_reduced_top_margin_resume(buffer, resume, theme=None):
+    content_elements = build_resume_flowables(resume, theme)
+    doc = resume_doc_template(buffer)
 
     # Build the PDF
     doc.build(content_elements)
@@ -0,0 +1,312 @@
+"""Page images of a resume draft without producing (or writing) a PDF.
+
+The resume is laid out by the same ReportLab document template as the PDF,
+but drawn on a PreviewCanvas that records text runs, rectangles and lines
+in page coordinates instead of serializing PDF. Recorded pages are turned
+into SVG (text positioned and stretched to ReportLab's measured widths) or
+PNG (drawn with Pillow from the same font files). Results are cached in
+memory by content hash; nothing touches disk.
+"""
+import os
+import base64
+import threading
+from io import BytesIO
+from collections import namedtuple, OrderedDict
+from xml.sax.saxutils import escape, quoteattr
+
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.pdfgen.textobject import PDFTextObject
+
+from .pdf_generator import (
+    build_resume_flowables, resume_doc_template, scaled_theme, FONTS, PAGE_MARGIN,
+    avenir, work_sans, work_sans_bold, work_sans_italic
+)
+from .render_cache import render_key
+from .resume_templates import get_template
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    # Pillow ships with ReportLab, but PNG previews are optional all the same
+    Image = None
+
+PREVIEW_CACHE_SIZE = int(os.getenv("PREVIEW_CACHE_SIZE", "64"))
+PREVIEW_FORMATS = ('svg', 'png')
+MAX_PREVIEW_SCALE = 4
+# Rasterized characters kept for PNG previews (per font, size and character)
+GLYPH_CACHE_SIZE = 20000
+
+# Font family, weight and style for SVG text, by ReportLab font name
+SVG_FONTS = {
+    avenir: ("'Avenir Next', Avenir, sans-serif", 'normal', 'normal'),
+    work_sans: ("'Work Sans', sans-serif", 'normal', 'normal'),
+    work_sans_bold: ("'Work Sans', sans-serif", 'bold', 'normal'),
+    work_sans_italic: ("'Work Sans', sans-serif", 'normal', 'italic'),
+}
+
+TextRun = namedtuple('TextRun', ['x', 'y', 'text', 'font', 'size', 'color', 'width'])
+Box = namedtuple('Box', ['x', 'y', 'width', 'height', 'fill', 'stroke', 'line_width'])
+Line = namedtuple('Line', ['x1', 'y1', 'x2', 'y2', 'color', 'width'])
+PreviewLayout = namedtuple('PreviewLayout', ['pages', 'width', 'height'])
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_pil_fonts = {}
+_glyphs = {}
+
+
+class _RecordingText(PDFTextObject):
+    """Text object that records each run at its position on the page.
+
+    Tracks the PDF text line matrix itself, since PDFTextObject leaves
+    line feeds (T*) and the advance after each run to the PDF viewer.
+    """
+
+    def __init__(self, canvas, x=0, y=0, direction=None):
+        self.runs = []
+        PDFTextObject.__init__(self, canvas, x, y, direction)
+        self._fillColorObj = canvas._fillColorObj
+
+    def setTextOrigin(self, x, y):
+        PDFTextObject.setTextOrigin(self, x, y)
+        self._line = [x, y]
+        self._advance = 0
+
+    def moveCursor(self, dx, dy):
+        PDFTextObject.moveCursor(self, dx, dy)
+        self._line[0] += dx
+        self._line[1] -= dy
+        self._advance = 0
+
+    def _record(self, text):
+        if not text:
+            return
+        width = self._canvas.stringWidth(text, self._fontname, self._fontsize)
+        width += getattr(self, '_charSpace', 0) * len(text) + getattr(self, '_wordSpace', 0) * text.count(' ')
+        self.runs.append(TextRun(self._line[0] + self._advance, self._line[1] + self._rise, text,
+                                 self._fontname, self._fontsize, self._fillColorObj, width))
+        self._advance += width
+
+    def _newline(self):
+        self._line[1] -= self._leading
+        self._advance = 0
+
+    def _textOut(self, text, TStar=0):
+        self._record(text)
+        if TStar:
+            self._newline()
+
+    def textOut(self, text):
+        self._record(text)
+
+    def textLine(self, text=''):
+        self._record(text)
+        self._newline()
+
+
+class PreviewCanvas(Canvas):
+    """Canvas that records what platypus draws, one list of items per page."""
+
+    def __init__(self, *args, **kwargs):
+        Canvas.__init__(self, *args, **kwargs)
+        self.pages = [[]]
+
+    def beginText(self, x=0, y=0, direction=None):
+        return _RecordingText(self, x, y, direction)
+
+    def drawText(self, aTextObject):
+        for run in aTextObject.runs:
+            x, y = self.absolutePosition(run.x, run.y)
+            self.pages[-1].append(run._replace(x=x, y=y))
+
+    def rect(self, x, y, width, height, stroke=1, fill=0):
+        x1, y1 = self.absolutePosition(x, y)
+        x2, y2 = self.absolutePosition(x + width, y + height)
+        self.pages[-1].append(Box(
+            min(x1, x2), min(y1, y2), abs(x2 - x1), abs(y2 - y1),
+            self._fillColorObj if fill else None, self._strokeColorObj if stroke else None, self._lineWidth
+        ))
+
+    def line(self, x1, y1, x2, y2):
+        x1, y1 = self.absolutePosition(x1, y1)
+        x2, y2 = self.absolutePosition(x2, y2)
+        self.pages[-1].append(Line(x1, y1, x2, y2, self._strokeColorObj, self._lineWidth))
+
+    def lines(self, linelist):
+        for x1, y1, x2, y2 in linelist:
+            self.line(x1, y1, x2, y2)
+
+    def showPage(self):
+        Canvas.showPage(self)
+        self.pages.append([])
+
+    def save(self):
+        # Nothing to write; drop the page opened by the final showPage
+        if not self.pages[-1]:
+            self.pages.pop()
+
+
+def layout_resume(full_resume, theme=None):
+    """Lay out a merged resume and return the recorded pages."""
+    canvases = []
+
+    def canvasmaker(*args, **kwargs):
+        canvas = PreviewCanvas(*args, **kwargs)
+        canvases.append(canvas)
+        return canvas
+
+    doc = resume_doc_template(BytesIO())
+    doc.build(build_resume_flowables(full_resume, theme), canvasmaker=canvasmaker)
+    width, height = doc.pagesize
+    return PreviewLayout(canvases[-1].pages, width, height)
+
+
+def _content_bottom(page):
+    """Lowest y any item on the page reaches (text descenders approximated)."""
+    bottoms = [item.y - 0.25 * item.size if isinstance(item, TextRun) else
+               (item.y if isinstance(item, Box) else min(item.y1, item.y2)) for item in page]
+    return min(bottoms) if bottoms else None
+
+
+def layout_metrics(layout):
+    """Page count, whether content spills past the first page, and by how much (points)."""
+    frame_top = layout.height - PAGE_MARGIN
+    overflow_height = 0
+    for page in layout.pages[1:]:
+        bottom = _content_bottom(page)
+        if bottom is not None:
+            overflow_height += frame_top - bottom
+    last_bottom = _content_bottom(layout.pages[-1]) if layout.pages else None
+    return {
+        'pages': len(layout.pages),
+        'overflow': len(layout.pages) > 1,
+        'overflow_height': round(overflow_height, 1),
+        # Free space below the content on the last page
+        'remaining_height': round(max(0, last_bottom - PAGE_MARGIN), 1) if last_bottom is not None else None
+    }
+
+
+def _hex(color):
+    if color is None:
+        return 'none'
+    color = colors.toColor(color)
+    return '#%02x%02x%02x' % tuple(int(round(c * 255)) for c in color.rgb())
+
+
+def render_svg(page, width, height, scale=1.0):
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width * scale:g}" height="{height * scale:g}" '
+           f'viewBox="0 0 {width:g} {height:g}">',
+           f'<rect width="{width:g}" height="{height:g}" fill="#ffffff"/>']
+    for item in page:
+        if isinstance(item, TextRun):
+            family, weight, style = SVG_FONTS.get(item.font, ('sans-serif', 'normal', 'normal'))
+            # textLength pins each run to ReportLab's width even if the viewer's font differs
+            out.append(
+                f'<text x="{item.x:.2f}" y="{height - item.y:.2f}" font-family={quoteattr(family)} '
+                f'font-weight="{weight}" font-style="{style}" font-size="{item.size:g}" '
+                f'fill="{_hex(item.color)}" textLength="{item.width:.2f}" lengthAdjust="spacingAndGlyphs" '
+                f'xml:space="preserve">{escape(item.text)}</text>'
+            )
+        elif isinstance(item, Box):
+            out.append(
+                f'<rect x="{item.x:.2f}" y="{height - item.y - item.height:.2f}" width="{item.width:.2f}" '
+                f'height="{item.height:.2f}" fill="{_hex(item.fill)}" stroke="{_hex(item.stroke)}" '
+                f'stroke-width="{item.line_width:g}"/>'
+            )
+        else:
+            out.append(
+                f'<line x1="{item.x1:.2f}" y1="{height - item.y1:.2f}" x2="{item.x2:.2f}" '
+                f'y2="{height - item.y2:.2f}" stroke="{_hex(item.color)}" stroke-width="{item.width:g}"/>'
+            )
+    out.append('</svg>')
+    return ''.join(out)
+
+
+def _pil_font(name, size):
+    key = (name, size)
+    font = _pil_fonts.get(key)
+    if font is None:
+        path = dict(FONTS).get(name)
+        font = ImageFont.truetype(path, size) if path and os.path.exists(path) else ImageFont.load_default()
+        _pil_fonts[key] = font
+    return font
+
+
+def _glyph(name, size, char):
+    """(mask, dx, dy) of one rasterized character, relative to its baseline origin.
+
+    Rasterizing whole lines with FreeType is slow; characters repeat, so each
+    is drawn once per font and size and pasted at ReportLab's own advances.
+    """
+    key = (name, size, char)
+    glyph = _glyphs.get(key)
+    if glyph is None:
+        font = _pil_font(name, size)
+        left, top, right, bottom = font.getbbox(char, anchor='ls')
+        mask = Image.new('L', (max(1, right - left), max(1, bottom - top)), 0)
+        ImageDraw.Draw(mask).text((-left, -top), char, font=font, fill=255, anchor='ls')
+        if len(_glyphs) >= GLYPH_CACHE_SIZE:
+            _glyphs.clear()
+        glyph = _glyphs[key] = (mask, left, top)
+    return glyph
+
+
+def render_png(page, width, height, scale=1.0):
+    if Image is None:
+        raise ValueError('PNG previews need Pillow; use format "svg"')
+    image = Image.new('RGB', (int(round(width * scale)), int(round(height * scale))), 'white')
+    draw = ImageDraw.Draw(image)
+    for item in page:
+        if isinstance(item, TextRun):
+            size = item.size * scale
+            fill = _hex(item.color)
+            baseline = (height - item.y) * scale
+            x = item.x * scale
+            # Spread any word/char spacing the run was drawn with over its characters
+            natural = stringWidth(item.text, item.font, item.size)
+            extra = (item.width - natural) / len(item.text) * scale
+            for char in item.text:
+                if not char.isspace():
+                    mask, dx, dy = _glyph(item.font, size, char)
+                    image.paste(fill, (int(round(x + dx)), int(round(baseline + dy))), mask)
+                x += stringWidth(char, item.font, item.size) * scale + extra
+        elif isinstance(item, Box):
+            box = [item.x * scale, (height - item.y - item.height) * scale,
+                   (item.x + item.width) * scale, (height - item.y) * scale]
+            draw.rectangle(box, fill=None if item.fill is None else _hex(item.fill),
+                           outline=None if item.stroke is None else _hex(item.stroke))
+        else:
+            draw.line([item.x1 * scale, (height - item.y1) * scale, item.x2 * scale, (height - item.y2) * scale],
+                      fill=_hex(item.color), width=max(1, int(round(item.width * scale))))
+    out = BytesIO()
+    # Previews are thrown away quickly; favour encode speed over size
+    image.save(out, format='PNG', compress_level=1)
+    return 'data:image/png;base64,' + base64.b64encode(out.getvalue()).decode('ascii')
+
+
+def preview_resume(full_resume, fmt='svg', scale=1.0, layout=None, template=None):
+    """Return (preview, cached): page images in fmt plus layout metrics, tightened by layout if given."""
+    if fmt not in PREVIEW_FORMATS:
+        raise ValueError(f"Unknown preview format: {fmt}")
+    key = (render_key(full_resume, layout, template), fmt, scale)
+    with _cache_lock:
+        preview = _cache.get(key)
+        if preview is not None:
+            _cache.move_to_end(key)
+            return preview, True
+
+    theme = get_template(template)
+    pages = layout_resume(full_resume, scaled_theme(layout, theme) if layout else theme)
+    render = render_svg if fmt == 'svg' else render_png
+    preview = {
+        **layout_metrics(pages),
+        'format': fmt,
+        'images': [render(page, pages.width, pages.height, scale) for page in pages.pages]
+    }
+    with _cache_lock:
+        _cache[key] = preview
+        while len(_cache) > PREVIEW_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return preview, False
@@ -0,0 +1,84 @@
+"""Which profile a request works on.
+
+The profile is resolved once per request, in this order:
+
+1. an explicit `profile` query parameter, `X-Profile` header or top-level
+   `profile` field of a JSON body;
+2. the `profile` cookie set by POST /profiles/switch;
+3. the default profile.
+
+It is kept on flask.g for the rest of the request, so concurrent requests,
+worker processes and nodes never share a selection. Outside a request (e.g.
+in background jobs) callers pass the profile name explicitly.
+"""
+from flask import g, request, has_app_context
+
+from .storage import profile_paths, DEFAULT_PROFILE
+
+PROFILE_COOKIE = 'profile'
+PROFILE_HEADER = 'X-Profile'
+# Keep the selection for a year; it is not a secret, only a preference
+PROFILE_COOKIE_MAX_AGE = 365 * 24 * 3600
+
+
+class UnknownProfileError(Exception):
+    """Raised when a request explicitly names a profile that does not exist."""
+
+
+class ProfileContext:
+    """The profile of the current request and where it was chosen ('param', 'cookie' or 'default')."""
+
+    def __init__(self, name, source):
+        self.name = name
+        self.source = source
+        self._paths = None
+
+    @property
+    def paths(self):
+        if self._paths is None:
+            self._paths = profile_paths(self.name)
+        return self._paths
+
+
+def valid_profile_name(name):
+    # Same alphabet as profile creation; also keeps names from escaping profiles/
+    return bool(name) and all(x.isalnum() or x in ('-', '_') for x in name)
+
+
+def _requested_profile():
+    name = request.args.get('profile') or request.headers.get(PROFILE_HEADER)
+    if not name and request.is_json:
+        body = request.get_json(silent=True)
+        if isinstance(body, dict) and isinstance(body.get('profile'), str):
+            name = body['profile']
+    return name
+
+
+def resolve_profile(exists):
+    """Build the request's ProfileContext; exists(name) checks that a profile exists."""
+    name = _requested_profile()
+    if name:
+        if not valid_profile_name(name) or not exists(name):
+            raise UnknownProfileError(f"Profile does not exist: {name}")
+        return ProfileContext(name, 'param')
+    name = request.cookies.get(PROFILE_COOKIE)
+    # A cookie can outlive the profile it names
+    if name and valid_profile_name(name) and exists(name):
+        return ProfileContext(name, 'cookie')
+    return ProfileContext(DEFAULT_PROFILE, 'default')
+
+
+def get_active_profile():
+    """Name of the current request's profile; the default profile outside a request."""
+    if has_app_context():
+        context = g.get('profile')
+        if context is not None:
+            return context.name
+    return DEFAULT_PROFILE
+
+
+def remember_profile(response, name):
+    """Make name the profile for this client's later requests."""
+    response.set_cookie(PROFILE_COOKIE, name, max_age=PROFILE_COOKIE_MAX_AGE,
+                        httponly=True, samesite='Lax')
+    return response
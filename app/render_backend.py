@@ -0,0 +1,109 @@
+import os
+import atexit
+import threading
+import multiprocessing
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from .pdf_generator import generate_reduced_top_margin_resume, register_fonts, scaled_theme
+from .resume_templates import get_template
+
+# 'inline' renders on the request thread, 'process' sends renders to a warm process pool
+RENDER_BACKEND = os.getenv("RENDER_BACKEND", "inline")
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 2)))
+# Renders allowed to wait for a free worker before new ones are rejected
+RENDER_MAX_QUEUE = int(os.getenv("RENDER_MAX_QUEUE", "16"))
+# Seconds a request waits for its render before giving up
+RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT", "30"))
+
+
+class RenderBusyError(Exception):
+    """Raised when the render queue is full."""
+
+
+class RenderTimeoutError(Exception):
+    """Raised when a render does not finish within RENDER_TIMEOUT."""
+
+
+_executor = None
+_slots = None
+_executor_lock = threading.Lock()
+# ReportLab's TTF subsetting (run when a PDF is saved) is not thread-safe, so
+# renders in this process take turns; use the process backend for parallelism
+_inline_lock = threading.Lock()
+
+
+def render_pdf_bytes(full_resume, layout=None, template=None):
+    """Render a merged resume to PDF bytes in the current process with a template, tightened by layout if given."""
+    buffer = BytesIO()
+    theme = get_template(template)
+    if layout:
+        theme = scaled_theme(layout, theme)
+    generate_reduced_top_margin_resume(buffer, full_resume, theme)
+    return buffer.getvalue()
+
+
+def _init_worker():
+    # Pay for font parsing once per worker, not on the first job
+    register_fonts()
+
+
+def _warm_up():
+    return os.getpid()
+
+
+def start_render_pool():
+    """Create and warm the process pool. Safe to call more than once."""
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is not None:
+            return _executor
+        # spawn avoids forking a multi-threaded web server
+        context = multiprocessing.get_context('spawn')
+        _executor = ProcessPoolExecutor(
+            max_workers=RENDER_WORKERS,
+            mp_context=context,
+            initializer=_init_worker
+        )
+        _slots = threading.BoundedSemaphore(RENDER_WORKERS + RENDER_MAX_QUEUE)
+        warmups = [_executor.submit(_warm_up) for _ in range(RENDER_WORKERS)]
+    for future in warmups:
+        future.result()
+    return _executor
+
+
+def shutdown_render_pool():
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _slots = None
+
+
+atexit.register(shutdown_render_pool)
+
+
+def render_pdf(full_resume, timeout=None, layout=None, template=None):
+    """Render through the configured backend and return the PDF bytes."""
+    if RENDER_BACKEND != 'process':
+        with _inline_lock:
+            return render_pdf_bytes(full_resume, layout, template)
+
+    executor = start_render_pool()
+    slots = _slots
+    if not slots.acquire(blocking=False):
+        raise RenderBusyError('Too many PDF renders in progress, try again shortly')
+
+    try:
+        future = executor.submit(render_pdf_bytes, full_resume, layout, template)
+    except Exception:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+
+    try:
+        return future.result(timeout=RENDER_TIMEOUT if timeout is None else timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise RenderTimeoutError('PDF render timed out')
@@ -0,0 +1,104 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from .pdf_generator import RENDER_VERSION, DEFAULT_LAYOUT
+from .resume_templates import DEFAULT_TEMPLATE
+
+# Maximum number of rendered PDFs kept in memory
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "64"))
+# Maximum number of rendered PDFs kept on disk per profile; the least recently used go first
+RENDER_DISK_CACHE_SIZE = int(os.getenv("RENDER_DISK_CACHE_SIZE", "256"))
+RENDER_CACHE_DIRNAME = 'render_cache'
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+
+
+def render_key(full_resume, layout=None, template=None):
+    """Canonical content hash of a merged resume plus the template/font version, template and layout."""
+    canonical = json.dumps(full_resume, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    digest = hashlib.sha256()
+    digest.update(RENDER_VERSION.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(canonical.encode('utf-8'))
+    if template and template != DEFAULT_TEMPLATE:
+        digest.update(b'\0')
+        digest.update(template.encode('utf-8'))
+    if layout and tuple(layout) != DEFAULT_LAYOUT:
+        digest.update(b'\0')
+        digest.update(json.dumps(list(layout)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _disk_path(storage_dir, key):
+    return os.path.join(storage_dir, RENDER_CACHE_DIRNAME, f"{key}.pdf")
+
+
+def get_cached_pdf(key, storage_dir):
+    """Return cached PDF bytes for key from memory, then disk, or None."""
+    with _lock:
+        pdf_bytes = _memory.get(key)
+        if pdf_bytes is not None:
+            _memory.move_to_end(key)
+            return pdf_bytes
+
+    path = _disk_path(storage_dir, key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            pdf_bytes = f.read()
+        # Mark it recently used for eviction
+        os.utime(path)
+    except FileNotFoundError:
+        # Evicted by another worker in the meantime
+        return None
+    _remember(key, pdf_bytes)
+    return pdf_bytes
+
+
+def store_cached_pdf(key, storage_dir, pdf_bytes):
+    """Add a freshly rendered PDF to both cache tiers."""
+    _remember(key, pdf_bytes)
+
+    cache_dir = os.path.join(storage_dir, RENDER_CACHE_DIRNAME)
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+    path = _disk_path(storage_dir, key)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(pdf_bytes)
+    os.replace(tmp_path, path)
+    _evict_disk(cache_dir)
+
+
+def _evict_disk(cache_dir):
+    """Delete the least recently used PDFs beyond RENDER_DISK_CACHE_SIZE."""
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.name.endswith('.pdf'):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    pass
+    if len(entries) <= RENDER_DISK_CACHE_SIZE:
+        return
+    entries.sort()
+    for _, path in entries[:len(entries) - RENDER_DISK_CACHE_SIZE]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Another worker evicted it first
+            pass
+
+
+def _remember(key, pdf_bytes):
+    with _lock:
+        _memory[key] = pdf_bytes
+        _memory.move_to_end(key)
+        while len(_memory) > RENDER_CACHE_SIZE:
+            _memory.popitem(last=False)
@@ -0,0 +1,132 @@
+"""Registry of resume layouts.
+
+Each template is a declarative spec in the form of
+pdf_generator.CLASSIC_TEMPLATE: section order, paragraph and table styles,
+gaps and column widths. A spec can extend a registered template and only
+override what differs. Specs are compiled into a Theme once, when
+registered, so a render with any template does no style building or
+parsing of its own, and the section cache keeps each template's sections
+apart.
+"""
+import copy
+import threading
+
+from reportlab.lib.enums import TA_LEFT
+
+from .pdf_generator import CLASSIC_TEMPLATE, DEFAULT_THEME, compile_theme, work_sans_bold
+
+DEFAULT_TEMPLATE = CLASSIC_TEMPLATE['name']
+
+COMPACT_TEMPLATE = {
+    'name': 'compact',
+    'description': 'Smaller type and tighter spacing for long histories',
+    'extends': 'classic',
+    'styles': {
+        'header': {'fontSize': 20, 'spaceAfter': 6},
+        'contact': {'fontSize': 9, 'spaceAfter': 12},
+        'section_header': {'fontSize': 10, 'spaceBefore': 8, 'spaceAfter': 2},
+        'body': {'fontSize': 9, 'leading': 11, 'spaceAfter': 1},
+        'company': {'fontSize': 10},
+        'position': {'fontSize': 9, 'spaceAfter': 1},
+        'date_location': {'fontSize': 9},
+        'bullet': {'fontSize': 9, 'spaceAfter': 1},
+        'skill_category': {'fontSize': 9},
+        'skill_keywords': {'fontSize': 9},
+    },
+    'gaps': {'section_gap': 5, 'job_header_gap': 2, 'job_gap': 8, 'edu_gap': 4},
+    'columns': {
+        'skill_columns': (1.5, 6.3),
+        'job_columns': (5.6, 2.2),
+        'edu_columns': (6.1, 1.7),
+    },
+}
+
+MODERN_TEMPLATE = {
+    'name': 'modern',
+    'description': 'Left-aligned header, experience before skills',
+    'extends': 'classic',
+    'sections': ['header', 'summary', 'work', 'skills', 'education'],
+    'styles': {
+        'header': {'fontName': work_sans_bold, 'fontSize': 22, 'alignment': TA_LEFT, 'spaceAfter': 6},
+        'contact': {'alignment': TA_LEFT, 'spaceAfter': 14},
+        'section_header': {'textColor': '#2C3E50'},
+        'company': {'textColor': '#2C3E50', 'leftIndent': 0},
+        'position': {'leftIndent': 0},
+        'skill_category': {'leftIndent': 0},
+    },
+    'tables': {
+        'separator_table': {'background': '#2C3E50', 'padding': (0, 0, 0, 0)},
+    },
+    'columns': {
+        'skill_columns': (1.6, 6.2),
+    },
+}
+
+_templates = {}
+_specs = {}
+_lock = threading.Lock()
+
+
+class UnknownTemplateError(Exception):
+    """Raised when a request names a template that is not registered."""
+
+
+def _merge(base, spec):
+    """base with spec's overrides; style, table, gap and column entries are merged one by one."""
+    merged = copy.deepcopy(base)
+    for key, value in spec.items():
+        if key == 'extends':
+            continue
+        if key in ('styles', 'tables', 'gaps', 'columns'):
+            for field, options in value.items():
+                if key == 'styles':
+                    merged[key][field] = {**merged[key].get(field, {}), **options}
+                else:
+                    merged[key][field] = options
+        else:
+            merged[key] = value
+    return merged
+
+
+def register_template(spec, theme=None):
+    """Compile spec (or use an already compiled theme) and make it available by name."""
+    if spec.get('extends'):
+        with _lock:
+            base = _specs.get(spec['extends'])
+        if base is None:
+            raise UnknownTemplateError(f"Template does not exist: {spec['extends']}")
+        spec = _merge(base, spec)
+    if theme is None:
+        theme = compile_theme(spec)
+    with _lock:
+        _specs[spec['name']] = spec
+        _templates[spec['name']] = theme
+    return theme
+
+
+def get_template(name=None):
+    """Compiled theme of a registered template; the default template if name is None."""
+    theme = _templates.get(name or DEFAULT_TEMPLATE)
+    if theme is None:
+        raise UnknownTemplateError(f"Template does not exist: {name}")
+    return theme
+
+
+def get_template_spec(name):
+    """The spec a template was compiled from, with anything it extends merged in."""
+    with _lock:
+        spec = _specs.get(name)
+    if spec is None:
+        raise UnknownTemplateError(f"Template does not exist: {name}")
+    return spec
+
+
+def list_templates():
+    with _lock:
+        return [{'name': name, 'description': spec.get('description', '')} for name, spec in _specs.items()]
+
+
+# The classic layout is compiled once by pdf_generator; share it so its sections stay cached
+register_template(CLASSIC_TEMPLATE, DEFAULT_THEME)
+register_template(COMPACT_TEMPLATE)
+register_template(MODERN_TEMPLATE)
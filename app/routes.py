@@ -1,21 +1,60 @@
-from flask import Blueprint, request, Response, render_template, jsonify
-from openai import OpenAI
+from flask import Blueprint, request, Response, render_template, jsonify, send_file, stream_with_context, g
 import os
+import re
 import json
 import uuid
+import hashlib
+import zipfile
 from io import BytesIO
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-import shutil
 
 from .services import (
-    get_profile_paths, ensure_profile_dirs, load_history, save_history_entry,
-    extract_json_from_response, extract_company_name,
-    get_active_profile, set_active_profile, get_profile_dir, PROFILES_DIR, DEFAULT_PROFILE
+    get_profile_paths, ensure_profile_dirs, save_history_entry, save_history_entries,
+    get_history_entry, query_history, query_profile_history, get_profile_version,
+    save_profile_history_entry, HISTORY_PAGE_SIZE, MAX_HISTORY_PAGE_SIZE, file_sha256,
+    load_resume_data, load_info, load_profile_data, save_resume_data, save_info, profile_cache_stats,
+    load_profile_prompts, save_profile_prompts, get_profile_names, profile_exists, init_profile, remove_profile,
+    profile_write_lock, get_company_name,
+    get_active_profile, DEFAULT_PROFILE
 )
-from .pdf_generator import generate_reduced_top_margin_resume
+from .profile_context import resolve_profile, remember_profile, UnknownProfileError
+from .json_stream import SectionStreamParser
+from .json_patch import apply_patch, JsonPatchError
+from .json_repair import extract_json_object, missing_sections, IncompleteResponseError
+from .section_patch import (
+    compact_json, editable_sections, parse_patch_response, apply_section_patch,
+    PATCH_FORMAT_PROMPT, EDIT_PATCH_FORMAT_PROMPT
+)
+from .llm_client import get_openai_client, submit_llm_call, count_tokens
+from .llm_cache import improve_key, get_cached_response, store_cached_response, llm_cache_stats
+from .jobs import (
+    register_job_type, submit_job, get_job, wait_for_update, JobQueueFullError, UnknownJobTypeError
+)
+from .render_backend import render_pdf, RenderBusyError, RenderTimeoutError, RENDER_BACKEND
+from .render_cache import render_key, get_cached_pdf, store_cached_pdf
+from .pdf_generator import section_cache_stats
+from .preview import preview_resume, PREVIEW_FORMATS, MAX_PREVIEW_SCALE
+from .page_fit import fit_layout, fit_summary, MAX_FIT_PAGES
+from .resume_templates import get_template, list_templates, DEFAULT_TEMPLATE, UnknownTemplateError
 
 main = Blueprint('main', __name__)
 
+# Upper bound on items accepted by /generate-pdf/batch
+MAX_BATCH_SIZE = 100
+# Renders in flight per batch with RENDER_BACKEND=process; inline batches render one at a time
+BATCH_RENDER_THREADS = 8
+# Upper bound on models per /improve-resume/fanout request
+MAX_FANOUT_MODELS = 8
+# Minimum seconds between progress updates from a running job
+PROGRESS_INTERVAL = 0.25
+# Seconds between status checks on a job event stream when no update arrives
+JOB_EVENTS_POLL = 1.0
+# Cache lifetime for downloaded artifacts, which are immutable once generated
+ARTIFACT_MAX_AGE = 365 * 24 * 3600
+
 # Available AI models
 AVAILABLE_MODELS = [
     {"id": "google/gemini-2.5-flash-lite-preview-09-2025", "name": "Gemini 2.5 Flash (Recommended)"},
@@ -30,16 +69,22 @@ def index():
     return render_template('index.html')
 
 
+@main.before_request
+def load_profile_context():
+    """Resolve the profile this request works on (see profile_context)."""
+    try:
+        g.profile = resolve_profile(profile_exists)
+    except UnknownProfileError as e:
+        return jsonify({'error': str(e)}), 404
+
+
 # Profile Management Endpoints
 
 @main.route('/profiles', methods=['GET'])
 def list_profiles():
     """List all available profiles."""
-    if not os.path.exists(PROFILES_DIR):
-        os.makedirs(PROFILES_DIR)
-    profiles = [d for d in os.listdir(PROFILES_DIR) if os.path.isdir(os.path.join(PROFILES_DIR, d))]
     return jsonify({
-        'profiles': profiles,
+        'profiles': get_profile_names(),
         'active': get_active_profile()
     })
 
@@ -54,19 +99,10 @@ def create_profile():
         # Sanitize name (basic)
         name = "".join(x for x in name if x.isalnum() or x in ('-', '_'))
         
-        target_dir = get_profile_dir(name)
-        if os.path.exists(target_dir):
+        if profile_exists(name):
             return jsonify({'error': 'Profile already exists'}), 400
             
-        os.makedirs(target_dir)
-        
-        # Initialize empty files
-        with open(os.path.join(target_dir, 'resume_data.json'), 'w') as f:
-            json.dump({}, f)
-        with open(os.path.join(target_dir, 'info.json'), 'w') as f:
-            json.dump({}, f)
-            
-        ensure_profile_dirs(name)
+        init_profile(name)
         
         return jsonify({'status': 'success', 'name': name})
     except Exception as e:
@@ -74,18 +110,16 @@ def create_profile():
 
 @main.route('/profiles/switch', methods=['POST'])
 def switch_profile():
-    """Switch the active profile."""
+    """Switch the active profile for this client (stored in a cookie)."""
     try:
         name = request.json.get('name')
         if not name:
             return jsonify({'error': 'Profile name is required'}), 400
             
-        target_dir = get_profile_dir(name)
-        if not os.path.exists(target_dir):
+        if not profile_exists(name):
             return jsonify({'error': 'Profile does not exist'}), 404
             
-        set_active_profile(name)
-        return jsonify({'status': 'success', 'active': name})
+        return remember_profile(jsonify({'status': 'success', 'active': name}), name)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -99,107 +133,481 @@ def delete_profile(name):
         if name == get_active_profile():
             return jsonify({'error': 'Cannot delete active profile'}), 400
             
-        target_dir = get_profile_dir(name)
-        if not os.path.exists(target_dir):
+        if not profile_exists(name):
             return jsonify({'error': 'Profile does not exist'}), 404
             
-        shutil.rmtree(target_dir)
+        remove_profile(name)
         return jsonify({'status': 'success'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+DEFAULT_PRE_PROMPT = ("Act as a JSON Data Processor and ATS Optimization Specialist\n"
+                "I am going to provide you with a **Resume in JSON format** and a **Target Job Description**.\n"
+                "Your task is to update the values inside the `work`, `professional_summary`, and `skills` arrays within the JSON to better match the Job Description.")
+
+DEFAULT_POST_PROMPT = ("**Strict Technical Constraints:**\n"
+"1.  **Output Format:** You must return **ONLY** valid, raw JSON. Do not include markdown formatting (like ```json), conversational filler, or explanations. Just the JSON object.\n"
+"2.  **Structure Integrity:** Do not change keys, variable names, or the overall structure of the JSON object.\n"
+"3.  **Minimal Edits:** You are allowed to change or insert a maximum of **3-4 specific keywords** to match the Job Description if necessary.\n"
+"4.  **Preserve Context:** Do not rewrite the sentences. Keep the original sentence structure and meaning, only swapping in technical terms or hard skills where they fit naturally.\n")
+
+# Patch mode answers with a patch, so the default leaves out the output format and structure rules
+DEFAULT_PATCH_POST_PROMPT = ("**Strict Technical Constraints:**\n"
+"1.  **Minimal Edits:** You are allowed to change or insert a maximum of **3-4 specific keywords** to match the Job Description if necessary.\n"
+"2.  **Preserve Context:** Do not rewrite the sentences. Keep the original sentence structure and meaning, only swapping in technical terms or hard skills where they fit naturally.\n")
+
+# Rules in a (custom) post-prompt that ask for the whole JSON document back
+_DOCUMENT_OUTPUT_RULE = re.compile(r'^[ \t]*\d+\.[ \t]*\*\*(Output Format|Structure Integrity):\*\*.*\n?', re.MULTILINE)
+
+
+IMPROVE_MODES = ('full', 'patch')
+
+
+def _improve_user_content(mode, job_description, original_resume, post_prompt, additional_context):
+    if mode == 'patch':
+        # Only the editable sections, compact; the model answers with a patch
+        resume_text = f"Editable resume sections (compact JSON)\n{compact_json(editable_sections(original_resume))}"
+        # A rule to return the JSON object would contradict PATCH_FORMAT_PROMPT
+        post_prompt = _DOCUMENT_OUTPUT_RULE.sub('', post_prompt)
+    else:
+        resume_text = f"Resume in JSON format\n{json.dumps(original_resume, indent=4)}"
+    
+    user_content = f"\nTarget Job Description\n{job_description}\n\n{resume_text}\n\n{post_prompt}"
+    
+    if additional_context:
+        user_content += f"\n\n**Additional Context/Instructions:**\n{additional_context}"
+    if mode == 'patch':
+        user_content += f"\n\n{PATCH_FORMAT_PROMPT}"
+    return user_content
+
+
+def _improve_request(body, model=None, profile_name=None):
+    """Build the chat messages for an /improve-resume request body.
+
+    `mode` is 'full' (the model returns the whole resume) or 'patch' (the
+    model sees only the editable sections and returns a JSON Patch). model
+    overrides the body's `model`.
+    """
+    job_description = body['description']
+    pre_prompt = body.get('pre_prompt') or DEFAULT_PRE_PROMPT
+    additional_context = body.get('additional_context')
+    model = model or body.get('model', 'google/gemini-2.5-flash-lite-preview-09-2025')
+    mode = body.get('mode') or 'full'
+    if mode not in IMPROVE_MODES:
+        raise ValueError(f"mode must be one of: {', '.join(IMPROVE_MODES)}")
+    post_prompt = body.get('post_prompt') or (DEFAULT_PATCH_POST_PROMPT if mode == 'patch' else DEFAULT_POST_PROMPT)
+    # Skip cached responses (the fresh result is still cached)
+    refresh = bool(body.get('refresh'))
+    
+    # Load original resume
+    original_resume = load_resume_data(profile_name)
+    
+    messages = [
+        {
+            "role": "system",
+            "content": pre_prompt
+        },
+        {
+            "role": "user",
+            "content": _improve_user_content(mode, job_description, original_resume, post_prompt, additional_context)
+        }
+    ]
+    return {
+        'job_description': job_description,
+        'model': model,
+        'mode': mode,
+        'original': original_resume,
+        'messages': messages,
+        # What a full-document request would have sent, for the token report
+        'full_prompt': pre_prompt + _improve_user_content('full', job_description, original_resume,
+                                                         post_prompt, additional_context),
+        'cache_key': improve_key(model, mode, pre_prompt, post_prompt, additional_context,
+                                 job_description, original_resume),
+        'refresh': refresh
+    }
+
+
+def _parse_improvement(improve, content):
+    """Turn the model's answer into the improved resume.
+
+    A full-mode answer that is truncated or has lost parts of the resume's
+    structure is salvaged: only the damaged top-level sections are asked for
+    again, and merged into what was recovered.
+    """
+    if improve['mode'] == 'patch':
+        return apply_section_patch(improve['original'], parse_patch_response(content))
+    
+    original_resume = improve['original']
+    improved_resume, _ = extract_json_object(content)
+    missing = missing_sections(original_resume, improved_resume)
+    if not missing:
+        return improved_resume
+    return _ask_for_sections(improve['model'], improve['messages'], content,
+                             original_resume, improved_resume, missing, missing_sections)
+
+
+def _ask_for_sections(model, messages, content, original, recovered, missing, check):
+    """Ask the model once more for the `missing` top-level keys and merge them into recovered.
+
+    check(original, merged) lists the keys that are still unusable; if any
+    are, or the follow-up answer is itself cut off, IncompleteResponseError is
+    raised rather than returning a partial resume.
+    """
+    response = get_openai_client().chat.completions.create(
+        model=model,
+        messages=messages + [
+            {"role": "assistant", "content": content},
+            {"role": "user", "content": (
+                f"Your answer was incomplete. Return ONLY a JSON object with the keys {', '.join(missing)}, "
+                "updated as instructed and with the same structure as in the resume. Do not repeat the other keys."
+            )}
+        ]
+    )
+    rest, truncated = extract_json_object(response.choices[0].message.content)
+    if truncated:
+        raise IncompleteResponseError(f"Model response was cut off again while resending: {', '.join(missing)}")
+    merged = {**recovered, **{key: rest[key] for key in missing if key in rest}}
+    still_missing = check(original, merged)
+    if still_missing:
+        raise IncompleteResponseError(f"Model response is missing or malformed: {', '.join(still_missing)}")
+    # Keep the resume's key order
+    return {**{key: merged[key] for key in original}, **merged}
+
+
+def _absent_sections(reference, candidate):
+    """Top-level keys of reference that candidate lacks altogether."""
+    return [key for key in reference if key not in candidate]
+
+
+def _token_report(improve, content, usage=None):
+    """Estimated prompt/completion tokens next to what a full-document request costs."""
+    report = {
+        'mode': improve['mode'],
+        'prompt': count_tokens(''.join(m['content'] for m in improve['messages'])),
+        'completion': count_tokens(content),
+        'full_prompt': count_tokens(improve['full_prompt']),
+        'full_completion': count_tokens(json.dumps(improve['original'], indent=4))
+    }
+    if usage is not None:
+        report['usage'] = {'prompt_tokens': usage.prompt_tokens, 'completion_tokens': usage.completion_tokens}
+    return report
+
+
+def _cached_improvement(improve):
+    if improve['refresh']:
+        return None
+    return get_cached_response(improve['cache_key'])
+
+
+def _submit_company_lookup(improve):
+    return submit_llm_call(get_company_name, improve['job_description'], improve['model'], improve['refresh'])
+
+
+def _company_result(company_future, cache):
+    # A failed company lookup should not throw away the improved resume
+    try:
+        company_name, cache['company_name'] = company_future.result()
+        return {'company_name': company_name}
+    except Exception as e:
+        cache['company_name'] = False
+        return {'company_name': 'default_company', 'company_name_error': str(e)}
+
+
+def _improvement_result(improve, improved_resume, tokens, cache, company_future):
+    result = {
+        'original': improve['original'],
+        'improved': improved_resume
+    }
+    if tokens is not None:
+        result['tokens'] = tokens
+    result.update(_company_result(company_future, cache))
+    result['cache'] = cache
+    return result
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @main.route('/improve-resume', methods=['POST'])
 def improve_resume():
-    """Generate improved resume JSON and return comparison with original."""
+    """Generate improved resume JSON and return comparison with original.
+
+    `cache` in the response reports which parts were served from the LLM
+    response cache; send `refresh: true` to bypass it. `tokens` compares the
+    request's size with a full-document request when the model was called.
+    """
     try:
-        job_description = request.json['description']
-        pre_prompt = request.json.get('pre_prompt')
-        post_prompt = request.json.get('post_prompt')
-        additional_context = request.json.get('additional_context')
-        model = request.json.get('model', 'google/gemini-2.5-flash-lite-preview-09-2025')
-        
-        paths = get_profile_paths()
+        improve = _improve_request(request.json)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        # The company name only needs the job description, so fetch it while the rewrite runs
+        company_future = _submit_company_lookup(improve)
         
-        # Load original resume
-        if os.path.exists(paths['resume_data']):
-            with open(paths['resume_data'], 'r') as file:
-                original_resume = json.load(file)
+        cache = {'improved': False}
+        tokens = None
+        improved_resume = _cached_improvement(improve)
+        if improved_resume is not None:
+            cache['improved'] = True
         else:
-            original_resume = {}
-        
-        # Prepare prompts
-        if not pre_prompt:
-            pre_prompt = ("Act as a JSON Data Processor and ATS Optimization Specialist\n"
-                            "I am going to provide you with a **Resume in JSON format** and a **Target Job Description**.\n"
-                            "Your task is to update the values inside the `work`, `professional_summary`, and `skills` arrays within the JSON to better match the Job Description.")
-        
-        if not post_prompt:
-            post_prompt = ("**Strict Technical Constraints:**\n"
-            "1.  **Output Format:** You must return **ONLY** valid, raw JSON. Do not include markdown formatting (like ```json), conversational filler, or explanations. Just the JSON object.\n"
-            "2.  **Structure Integrity:** Do not change keys, variable names, or the overall structure of the JSON object.\n"
-            "3.  **Minimal Edits:** You are allowed to change or insert a maximum of **3-4 specific keywords** to match the Job Description if necessary.\n"
-            "4.  **Preserve Context:** Do not rewrite the sentences. Keep the original sentence structure and meaning, only swapping in technical terms or hard skills where they fit naturally.\n")
-        
-        # Call OpenRouter API to improve resume
-        client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=os.getenv("API_KEY")
-        )
-        
-        user_content = f"\nTarget Job Description\n{job_description}\n\nResume in JSON format\n{json.dumps(original_resume, indent=4)}\n\n{post_prompt}"
-        
-        if additional_context:
-            user_content += f"\n\n**Additional Context/Instructions:**\n{additional_context}"
-        
-        messages = [
-            {
-                "role": "system",
-                "content": pre_prompt
-            },
-            {
-                "role": "user",
-                "content": user_content
-            }
-        ]
-        
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages
-        )
-        
-        # Extract improved resume JSON
-        improved_resume = extract_json_from_response(response.choices[0].message.content)
-        
-        # Extract company name
-        company_name = extract_company_name(job_description, model)
+            # Call OpenRouter API to improve resume
+            client = get_openai_client()
+            response = client.chat.completions.create(
+                model=improve['model'],
+                messages=improve['messages']
+            )
+            
+            # Extract improved resume JSON (or apply the returned patch)
+            content = response.choices[0].message.content
+            improved_resume = _parse_improvement(improve, content)
+            store_cached_response(improve['cache_key'], improved_resume)
+            tokens = _token_report(improve, content, response.usage)
         
         # Return both original and improved for comparison
-        return jsonify({
-            'original': original_resume,
-            'improved': improved_resume,
-            'company_name': company_name
-        })
+        return jsonify(_improvement_result(improve, improved_resume, tokens, cache, company_future))
     
+    except JsonPatchError as e:
+        return jsonify({'error': f"Model returned an invalid patch: {e}"}), 502
+    except IncompleteResponseError as e:
+        return jsonify({'error': str(e)}), 502
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@main.route('/ai-edit-resume', methods=['POST'])
-def ai_edit_resume():
-    """Update resume data based on natural language instruction."""
+@main.route('/improve-resume/stream', methods=['POST'])
+def improve_resume_stream():
+    """Stream the improvement as Server-Sent Events.
+
+    Events: `original` (current resume), `token` (raw model text), `section`
+    ({key, value} when a top-level field closes, {key, index, value} for each
+    closed item of a top-level array such as `work`), `company`, `improved`
+    (the full parsed result), `done` ({cache, tokens} as in /improve-resume),
+    and `error` (with `status: 502` when the model's answer was unusable). Cached results and patch-mode results are replayed as
+    section events once complete.
+    """
     try:
-        data = request.json
-        instruction = data.get('instruction')
-        current_data = data.get('current_data')
-        model = data.get('model', 'google/gemini-2.0-flash-001')
-        
-        if not instruction or not current_data:
-            return jsonify({'error': 'Instruction and current data are required'}), 400
+        improve = _improve_request(request.json)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def generate():
+        company_future = _submit_company_lookup(improve)
+        company_sent = False
+        cache = {'improved': False}
+        done = {'cache': cache}
+        try:
+            yield _sse('original', improve['original'])
             
-        # Prepare prompt
-        system_prompt = "Act as a JSON Data Processor. Your task is to update the provided Resume JSON data based on the user's natural language instruction."
+            parser = None
+            improved_resume = _cached_improvement(improve)
+            if improved_resume is not None:
+                cache['improved'] = True
+            else:
+                stream = get_openai_client().chat.completions.create(
+                    model=improve['model'],
+                    messages=improve['messages'],
+                    stream=True
+                )
+                # A patch says nothing about whole sections until it has been applied
+                parser = SectionStreamParser() if improve['mode'] == 'full' else None
+                chunks = []
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    chunks.append(delta)
+                    yield _sse('token', {'text': delta})
+                    if parser is not None:
+                        for section in parser.feed(delta):
+                            yield _sse('section', section)
+                    if not company_sent and company_future.done():
+                        company_sent = True
+                        yield _sse('company', _company_result(company_future, cache))
+                
+                # The section events are previews; the full text is still validated as a whole
+                content = ''.join(chunks)
+                improved_resume = _parse_improvement(improve, content)
+                store_cached_response(improve['cache_key'], improved_resume)
+                done['tokens'] = _token_report(improve, content)
+            
+            if parser is None:
+                for section in SectionStreamParser().feed(json.dumps(improved_resume)):
+                    yield _sse('section', section)
+            yield _sse('improved', improved_resume)
+            if not company_sent:
+                yield _sse('company', _company_result(company_future, cache))
+            yield _sse('done', done)
+        except JsonPatchError as e:
+            # The stream has already started with a 200, so the status goes in the event
+            yield _sse('error', {'error': f"Model returned an invalid patch: {e}", 'status': 502})
+        except IncompleteResponseError as e:
+            yield _sse('error', {'error': str(e), 'status': 502})
+        except Exception as e:
+            yield _sse('error', {'error': str(e)})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+class ImprovementCancelled(Exception):
+    pass
+
+
+def _improve_with_model(improve, cancel, progress=None):
+    """Run one rewrite as a streamed call so it can stop as soon as cancel is set.
+
+    Returns (improved_resume, tokens, cached); tokens is None for a cache hit.
+    progress, if given, is called as progress('generating', characters=n) as
+    the response arrives (at most every PROGRESS_INTERVAL seconds).
+    """
+    start = time.perf_counter()
+    improved_resume = _cached_improvement(improve)
+    if improved_resume is not None:
+        return improved_resume, None, True
+    
+    stream = get_openai_client().chat.completions.create(
+        model=improve['model'],
+        messages=improve['messages'],
+        stream=True
+    )
+    chunks = []
+    received = 0
+    reported = 0.0
+    try:
+        for chunk in stream:
+            if cancel.is_set():
+                raise ImprovementCancelled()
+            if chunk.choices and chunk.choices[0].delta.content:
+                chunks.append(chunk.choices[0].delta.content)
+                received += len(chunks[-1])
+                if progress is not None and time.perf_counter() - reported >= PROGRESS_INTERVAL:
+                    reported = time.perf_counter()
+                    progress('generating', characters=received)
+    finally:
+        # Closing the response drops the connection, which stops the upstream generation
+        stream.close()
+    
+    content = ''.join(chunks)
+    improved_resume = _parse_improvement(improve, content)
+    store_cached_response(improve['cache_key'], improved_resume)
+    tokens = _token_report(improve, content)
+    tokens['seconds'] = round(time.perf_counter() - start, 3)
+    return improved_resume, tokens, False
+
+
+@main.route('/improve-resume/fanout', methods=['POST'])
+def improve_resume_fanout():
+    """Send the same improvement request to several models in parallel.
+
+    Takes the /improve-resume body plus `models` (list of model ids, default
+    all of AVAILABLE_MODELS). Streams Server-Sent Events: `original`, one
+    `result` ({model, improved, cached, tokens}) or `model_error` ({model,
+    error}) per model in completion order, `company`, then `done`.
+
+    With `race: true` the response is instead the /improve-resume JSON for
+    the first model to return a valid result, plus `model` and `cancelled`
+    (the models still running, whose requests are aborted).
+    """
+    try:
+        models = request.json.get('models') or [m['id'] for m in AVAILABLE_MODELS]
+        if not isinstance(models, list) or not all(isinstance(m, str) for m in models):
+            return jsonify({'error': 'models must be a list of model ids'}), 400
+        models = list(dict.fromkeys(models))
+        if len(models) > MAX_FANOUT_MODELS:
+            return jsonify({'error': f'At most {MAX_FANOUT_MODELS} models per request'}), 400
+        improves = {model: _improve_request(request.json, model) for model in models}
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    
+    cancel = threading.Event()
+    company_future = _submit_company_lookup(improves[models[0]])
+    futures = {submit_llm_call(_improve_with_model, improves[model], cancel): model for model in models}
+    original_resume = improves[models[0]]['original']
+    
+    if request.json.get('race'):
+        errors = {}
+        try:
+            for future in as_completed(futures):
+                model = futures[future]
+                try:
+                    improved_resume, tokens, cached = future.result()
+                except Exception as e:
+                    errors[model] = str(e)
+                    continue
+                
+                # First valid result wins; queued calls never start and running ones stop
+                cancel.set()
+                cancelled = [m for f, m in futures.items() if not f.done()]
+                for other in futures:
+                    other.cancel()
+                result = _improvement_result(improves[model], improved_resume, tokens,
+                                             {'improved': cached}, company_future)
+                result['model'] = model
+                result['cancelled'] = cancelled
+                return jsonify(result)
+            return jsonify({'error': 'No model returned a valid result', 'model_errors': errors}), 502
+        finally:
+            cancel.set()
+    
+    def generate():
+        cache = {}
+        try:
+            yield _sse('original', original_resume)
+            for future in as_completed(futures):
+                model = futures[future]
+                try:
+                    improved_resume, tokens, cached = future.result()
+                except Exception as e:
+                    yield _sse('model_error', {'model': model, 'error': str(e)})
+                    continue
+                yield _sse('result', {'model': model, 'improved': improved_resume, 'cached': cached, 'tokens': tokens})
+            yield _sse('company', _company_result(company_future, cache))
+            yield _sse('done', {'cache': cache})
+        except Exception as e:
+            yield _sse('error', {'error': str(e)})
+        finally:
+            # Stop the remaining calls if the client goes away
+            cancel.set()
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def _run_ai_edit(data):
+    """Apply a natural language instruction to data['current_data'] and return the result."""
+    instruction = data.get('instruction')
+    current_data = data.get('current_data')
+    model = data.get('model', 'google/gemini-2.0-flash-001')
+    
+    if not instruction or not current_data:
+        raise ValueError('Instruction and current data are required')
         
+    # Prepare prompt
+    system_prompt = "Act as a JSON Data Processor. Your task is to update the provided Resume JSON data based on the user's natural language instruction."
+    
+    if data.get('mode') == 'patch':
+        # Compact input and a patch back instead of the whole document
+        user_prompt = f"""
+Current Resume JSON:
+{compact_json(current_data)}
+
+Instruction:
+{instruction}
+
+{EDIT_PATCH_FORMAT_PROMPT}
+"""
+    else:
         user_prompt = f"""
 Current Resume JSON:
 {json.dumps(current_data, indent=2)}
@@ -214,123 +622,486 @@ Instruction:
 4. If the instruction implies adding a new item (like a job or skill), generate a reasonable structure for it matching existing items.
 """
 
-        # Call OpenRouter API
-        client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=os.getenv("API_KEY")
-        )
-        
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-        )
-        
-        # Extract and parse JSON
-        updated_data = extract_json_from_response(response.choices[0].message.content)
+    # Call OpenRouter API
+    client = get_openai_client()
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    response = client.chat.completions.create(model=model, messages=messages)
+    
+    # Extract and parse JSON
+    content = response.choices[0].message.content
+    if data.get('mode') == 'patch':
+        return apply_patch(current_data, parse_patch_response(content))
+    
+    updated_data, truncated = extract_json_object(content)
+    if not isinstance(current_data, dict):
+        return updated_data
+    # An edit may legitimately add or remove items, so a complete answer only
+    # has to keep every section; in a truncated one, sections that lost their
+    # shape were cut off and are asked for again
+    missing = (missing_sections if truncated else _absent_sections)(current_data, updated_data)
+    if missing:
+        updated_data = _ask_for_sections(model, messages, content, current_data, updated_data,
+                                         missing, _absent_sections)
+    return updated_data
+
+
+@main.route('/ai-edit-resume', methods=['POST'])
+def ai_edit_resume():
+    """Update resume data based on natural language instruction.
+
+    With `mode: 'patch'` the data is sent compact and the model returns a JSON
+    Patch that is applied here.
+    """
+    try:
+        data = request.json
+        if not data.get('instruction') or not data.get('current_data'):
+            return jsonify({'error': 'Instruction and current data are required'}), 400
         
-        return jsonify(updated_data)
+        return jsonify(_run_ai_edit(data))
         
+    except JsonPatchError as e:
+        return jsonify({'error': f"Model returned an invalid patch: {e}"}), 502
+    except IncompleteResponseError as e:
+        return jsonify({'error': str(e)}), 502
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def _get_or_render_pdf(full_resume, paths, layout=None, template=None):
+    """Reuse an identical earlier render if we have one, otherwise build the PDF."""
+    cache_key = render_key(full_resume, layout, template)
+    pdf_bytes = get_cached_pdf(cache_key, paths['storage'])
+    if pdf_bytes is None:
+        pdf_bytes = render_pdf(full_resume, layout=layout, template=template)
+        store_cached_pdf(cache_key, paths['storage'], pdf_bytes)
+    return pdf_bytes
+
+
+def _store_generated_resume(paths, full_resume, company_name, pdf_bytes):
+    """Write the PDF/JSON artifacts for one render and return its history entry."""
+    # Generate unique ID for this resume
+    resume_id = str(uuid.uuid4())
+    timestamp = datetime.now().isoformat()
+    
+    # Create directory for this resume
+    resume_dir = os.path.join(paths['storage'], resume_id)
+    os.makedirs(resume_dir)
+    
+    # Save PDF
+    pdf_path = os.path.join(resume_dir, "resume.pdf")
+    with open(pdf_path, 'wb') as output_file:
+        output_file.write(pdf_bytes)
+        
+    # Save JSON
+    json_path = os.path.join(resume_dir, "resume.json")
+    json_bytes = json.dumps(full_resume, indent=4).encode('utf-8')
+    with open(json_path, 'wb') as f:
+        f.write(json_bytes)
+    
+    # Also save to company directory for backward compatibility/organization
+    company_dir = os.path.join(paths['base'], company_name)
+    if not os.path.exists(company_dir):
+        os.makedirs(company_dir)
+    
+    # Write the bytes we already hold rather than copying the file back off disk
+    company_pdf_path = os.path.join(company_dir, "resume.pdf")
+    with open(company_pdf_path, 'wb') as output_file:
+        output_file.write(pdf_bytes)
+    
+    return {
+        'id': resume_id,
+        'company_name': company_name,
+        'timestamp': timestamp,
+        'pdf_path': pdf_path,
+        'json_path': json_path,
+        # Content hashes double as download ETags
+        'pdf_sha256': hashlib.sha256(pdf_bytes).hexdigest(),
+        'json_sha256': hashlib.sha256(json_bytes).hexdigest()
+    }
+
+
+def _run_generate_pdf(data, profile_name=None):
+    """Render data['resume'] for a profile, record it in history and return (pdf_bytes, entry)."""
+    error = _render_options_error(data)
+    if error:
+        raise ValueError(error)
+    resume_data = data['resume']
+    company_name = data.get('company_name')
+    if not company_name:
+        company_name = 'default_company'
+    
+    paths = get_profile_paths(profile_name)
+    ensure_profile_dirs(profile_name or get_active_profile())
+    
+    # Merge resume data with personal info
+    full_resume = {**resume_data, **load_info(profile_name)}
+    
+    template = data.get('template') or DEFAULT_TEMPLATE
+    theme = get_template(template)
+    
+    # Optionally tighten the layout to fit the requested page count
+    fit = fit_layout(full_resume, data['fit_pages'], theme) if data.get('fit_pages') else None
+    pdf_bytes = _get_or_render_pdf(full_resume, paths, fit.layout if fit else None, template)
+    
+    # Update history
+    entry = _store_generated_resume(paths, full_resume, company_name, pdf_bytes)
+    entry['template'] = template
+    if fit:
+        entry['page_fit'] = fit_summary(fit)
+    save_history_entry(entry, profile_name)
+    return pdf_bytes, entry
+
+
+def _render_options_error(data):
+    """Why data's optional fit_pages or template field is invalid, or None if both are fine."""
+    fit_pages = data.get('fit_pages')
+    if fit_pages is not None:
+        if isinstance(fit_pages, bool) or not isinstance(fit_pages, int) or not 1 <= fit_pages <= MAX_FIT_PAGES:
+            return f'fit_pages must be a whole number from 1 to {MAX_FIT_PAGES}'
+    template = data.get('template')
+    if template is not None:
+        if not isinstance(template, str):
+            return 'template must be a string'
+        try:
+            get_template(template)
+        except UnknownTemplateError as e:
+            return str(e)
+    return None
+
+
+@main.route('/templates', methods=['GET'])
+def list_resume_templates():
+    """Registered resume templates, for the template parameter of /generate-pdf and /preview."""
+    return jsonify({'templates': list_templates(), 'default': DEFAULT_TEMPLATE})
+
+
 @main.route('/generate-pdf', methods=['POST'])
 def generate_pdf():
-    """Generate PDF from resume JSON data."""
+    """Generate PDF from resume JSON data.
+
+    "template" picks a registered layout (see GET /templates). With "fit_pages": n, fonts, leading and spacing are tightened (within the
+    theme's bounds) until the resume fits on n pages; the chosen scales are
+    returned in the X-Page-Fit header and kept in the history entry.
+    """
+    try:
+        error = _render_options_error(request.json)
+        if error:
+            return jsonify({'error': error}), 400
+        pdf_bytes, entry = _run_generate_pdf(request.json)
+        
+        # Return PDF as response
+        headers = {'X-Page-Fit': json.dumps(entry['page_fit'])} if 'page_fit' in entry else None
+        return Response(pdf_bytes, content_type='application/pdf', headers=headers)
+    
+    except RenderBusyError as e:
+        return jsonify({'error': str(e)}), 503
+    except RenderTimeoutError as e:
+        return jsonify({'error': str(e)}), 504
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@main.route('/preview', methods=['POST'])
+def preview():
+    """Render a draft to page images without writing anything.
+
+    Expects {"resume": {...}, "format": "svg" | "png", "scale": 1.0}; the
+    profile's personal info is merged in as for /generate-pdf. Returns the
+    page count, overflow past the first page (in points) and one SVG document
+    or PNG data URI per page. "template" and "fit_pages" work as for
+    /generate-pdf; the chosen scales are returned as page_fit.
+    """
     try:
         data = request.json
-        resume_data = data['resume']
-        company_name = data.get('company_name')
-        if not company_name:
-            company_name = 'default_company'
+        resume = data.get('resume')
+        if not isinstance(resume, dict):
+            return jsonify({'error': 'resume must be an object'}), 400
+        fmt = data.get('format', 'svg')
+        if fmt not in PREVIEW_FORMATS:
+            return jsonify({'error': f"format must be one of {', '.join(PREVIEW_FORMATS)}"}), 400
+        scale = data.get('scale', 1.0)
+        if not isinstance(scale, (int, float)) or isinstance(scale, bool) or not 0 < scale <= MAX_PREVIEW_SCALE:
+            return jsonify({'error': f'scale must be between 0 and {MAX_PREVIEW_SCALE}'}), 400
+        error = _render_options_error(data)
+        if error:
+            return jsonify({'error': error}), 400
+
+        full_resume = {**resume, **load_info()}
+        template = data.get('template')
+        if data.get('fit_pages'):
+            fit = fit_layout(full_resume, data['fit_pages'], get_template(template))
+            result, cached = preview_resume(full_resume, fmt, float(scale), fit.layout, template)
+            result = {**result, 'page_fit': fit_summary(fit)}
+        else:
+            result, cached = preview_resume(full_resume, fmt, float(scale), template=template)
+        return jsonify({**result, 'cache': {'hit': cached}})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@main.route('/generate-pdf/batch', methods=['POST'])
+def generate_pdf_batch():
+    """Generate PDFs for many companies at once.
+
+    Expects {"items": [{"resume": {...}, "company_name": "..."}, ...], "format": "ids" | "zip"}.
+    """
+    try:
+        data = request.json
+        items = data.get('items')
+        if not items or not isinstance(items, list):
+            return jsonify({'error': 'A non-empty list of items is required'}), 400
+        if len(items) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} items per batch'}), 400
+        response_format = data.get('format', 'ids')
+        if response_format not in ('ids', 'zip'):
+            return jsonify({'error': 'Invalid format'}), 400
         
         paths = get_profile_paths()
         ensure_profile_dirs(get_active_profile())
+        info = load_info()
         
-        # Load personal info to merge with resume data
-        if os.path.exists(paths['info']):
-            with open(paths['info'], 'r') as file:
-                info = json.load(file)
-        else:
-            info = {}
-        
-        # Merge resume data with personal info
-        full_resume = {**resume_data, **info}
+        full_resumes = []
+        company_names = []
+        for item in items:
+            if not isinstance(item, dict) or not isinstance(item.get('resume'), dict):
+                return jsonify({'error': 'Each item needs a resume object'}), 400
+            full_resumes.append({**item['resume'], **info})
+            company_names.append(item.get('company_name') or 'default_company')
         
-        # Create PDF in memory
-        buffer = BytesIO()
-        generate_reduced_top_margin_resume(buffer, full_resume)
+        # Identical resumes in one batch are rendered once
+        unique = {}
+        for full_resume in full_resumes:
+            unique.setdefault(render_key(full_resume), full_resume)
         
-        # Generate unique ID for this resume
-        resume_id = str(uuid.uuid4())
-        timestamp = datetime.now().isoformat()
-        
-        # Create directory for this resume
-        resume_dir = os.path.join(paths['storage'], resume_id)
-        os.makedirs(resume_dir)
+        if RENDER_BACKEND == 'process':
+            with ThreadPoolExecutor(max_workers=min(len(unique), BATCH_RENDER_THREADS)) as executor:
+                futures = {
+                    key: executor.submit(_get_or_render_pdf, full_resume, paths)
+                    for key, full_resume in unique.items()
+                }
+                rendered = {key: future.result() for key, future in futures.items()}
+        else:
+            # Inline renders cannot overlap (see render_backend), so threads would only queue
+            rendered = {key: _get_or_render_pdf(full_resume, paths) for key, full_resume in unique.items()}
         
-        # Save PDF
-        pdf_path = os.path.join(resume_dir, "resume.pdf")
-        with open(pdf_path, 'wb') as output_file:
-            buffer.seek(0)
-            output_file.write(buffer.read())
-            
-        # Save JSON
-        json_path = os.path.join(resume_dir, "resume.json")
-        with open(json_path, 'w') as f:
-            json.dump(full_resume, f, indent=4)
-            
-        # Update history
-        entry = {
-            'id': resume_id,
-            'company_name': company_name,
-            'timestamp': timestamp,
-            'pdf_path': pdf_path,
-            'json_path': json_path
-        }
-        save_history_entry(entry)
+        entries = []
+        pdfs = []
+        for full_resume, company_name in zip(full_resumes, company_names):
+            pdf_bytes = rendered[render_key(full_resume)]
+            entries.append(_store_generated_resume(paths, full_resume, company_name, pdf_bytes))
+            pdfs.append(pdf_bytes)
         
-        # Also save to company directory for backward compatibility/organization
-        company_dir = os.path.join(paths['base'], company_name)
-        if not os.path.exists(company_dir):
-            os.makedirs(company_dir)
+        # One history write for the whole batch
+        save_history_entries(entries)
         
-        company_pdf_path = os.path.join(company_dir, "resume.pdf")
-        shutil.copy(pdf_path, company_pdf_path)
+        if response_format == 'zip':
+            archive = BytesIO()
+            with zipfile.ZipFile(archive, 'w', zipfile.ZIP_STORED) as zf:
+                for entry, pdf_bytes in zip(entries, pdfs):
+                    zf.writestr(f"{entry['company_name']}-{entry['id']}.pdf", pdf_bytes)
+            archive.seek(0)
+            return Response(
+                archive,
+                content_type='application/zip',
+                headers={'Content-Disposition': 'attachment; filename=resumes.zip'}
+            )
         
-        # Return PDF as response
-        buffer.seek(0)
-        return Response(buffer, content_type='application/pdf')
+        return jsonify({
+            'status': 'success',
+            'items': [{'id': e['id'], 'company_name': e['company_name']} for e in entries]
+        })
     
+    except RenderBusyError as e:
+        return jsonify({'error': str(e)}), 503
+    except RenderTimeoutError as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def _page_args():
+    """Pagination/filter query parameters shared by the history endpoints."""
+    limit = request.args.get('limit', HISTORY_PAGE_SIZE, type=int)
+    return {
+        'cursor': request.args.get('cursor'),
+        'limit': max(1, min(limit, MAX_HISTORY_PAGE_SIZE)),
+        'since': request.args.get('since'),
+        'until': request.args.get('until'),
+    }
+
+
+def _improve_job(params, progress):
+    improve = _improve_request(params['body'], profile_name=params['profile'])
+    company_future = _submit_company_lookup(improve)
+    progress('generating', characters=0)
+    improved_resume, tokens, cached = _improve_with_model(improve, threading.Event(), progress)
+    return _improvement_result(improve, improved_resume, tokens, {'improved': cached}, company_future)
+
+
+def _ai_edit_job(params, progress):
+    progress('generating')
+    return _run_ai_edit(params['body'])
+
+
+def _generate_pdf_job(params, progress):
+    progress('rendering')
+    _, entry = _run_generate_pdf(params['body'], params['profile'])
+    return {
+        'id': entry['id'],
+        'company_name': entry['company_name'],
+        'timestamp': entry['timestamp'],
+        'pdf_url': f"/download/{entry['id']}/pdf",
+        'json_url': f"/download/{entry['id']}/json"
+    }
+
+
+register_job_type('improve', _improve_job)
+register_job_type('ai_edit', _ai_edit_job)
+register_job_type('generate_pdf', _generate_pdf_job)
+
+
+def _job_links(job_id):
+    return {
+        'status_url': f"/jobs/{job_id}",
+        'result_url': f"/jobs/{job_id}/result",
+        'events_url': f"/jobs/{job_id}/events"
+    }
+
+
+@main.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue long-running work and return immediately.
+
+    Expects {"type": "improve" | "ai_edit" | "generate_pdf", "params": {...}},
+    where params is the body the matching synchronous endpoint takes. The job
+    runs against the request's profile. Returns 202 with the job id.
+    """
+    try:
+        data = request.json
+        params = data.get('params')
+        if not isinstance(params, dict):
+            return jsonify({'error': 'params must be an object'}), 400
+        if data.get('type') == 'generate_pdf':
+            error = _render_options_error(params)
+            if error:
+                return jsonify({'error': error}), 400
+        job_id = submit_job(data.get('type'), {'profile': get_active_profile(), 'body': params})
+        return jsonify({'id': job_id, 'status': 'queued', **_job_links(job_id)}), 202
+    except UnknownJobTypeError as e:
+        return jsonify({'error': str(e)}), 400
+    except JobQueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@main.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({**job, **_job_links(job_id)})
+
+
+@main.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """The job's result once it has succeeded; 202 with its status until then."""
+    job = get_job(job_id, include_result=True)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] == 'succeeded':
+        return jsonify(job['result'])
+    if job['status'] == 'failed':
+        return jsonify({'error': job['error']}), 500
+    return jsonify({'id': job_id, 'status': job['status'], 'progress': job['progress']}), 202
+
+
+@main.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Server-Sent Events for a job: `status` and `progress` on each change,
+    then `result` or `error` when it finishes."""
+    if get_job(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def generate():
+        status = progress = None
+        while True:
+            job = get_job(job_id, include_result=True)
+            if job['status'] != status:
+                status = job['status']
+                yield _sse('status', {'id': job_id, 'status': status})
+            if job['progress'] != progress:
+                progress = job['progress']
+                yield _sse('progress', progress)
+            if status == 'succeeded':
+                yield _sse('result', job['result'])
+                return
+            if status == 'failed':
+                yield _sse('error', {'error': job['error']})
+                return
+            # Woken by updates from this process; the timeout covers jobs run by other workers
+            wait_for_update(JOB_EVENTS_POLL)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @main.route('/history', methods=['GET'])
 def get_history():
-    """Get list of generated resumes."""
-    return jsonify(load_history())
+    """Get a page of generated resumes, newest first.
+
+    Query parameters: cursor, limit, company, since, until (ISO date or datetime).
+    """
+    try:
+        entries, next_cursor = query_history(company=request.args.get('company'), **_page_args())
+        return jsonify({'items': entries, 'next_cursor': next_cursor})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 
 @main.route('/download/<resume_id>/<file_type>', methods=['GET'])
 def download_file(resume_id, file_type):
     """Download PDF or JSON for a specific resume."""
     try:
-        history = load_history()
-        entry = next((item for item in history if item['id'] == resume_id), None)
+        entry = get_history_entry(resume_id)
         
         if not entry:
             return jsonify({'error': 'Resume not found'}), 404
             
         if file_type == 'pdf':
-            return Response(open(entry['pdf_path'], 'rb'), content_type='application/pdf')
+            path, mimetype = entry['pdf_path'], 'application/pdf'
         elif file_type == 'json':
-            return jsonify(json.load(open(entry['json_path'], 'r')))
+            path, mimetype = entry['json_path'], 'application/json'
         else:
             return jsonify({'error': 'Invalid file type'}), 400
+        
+        # Relative paths in history are relative to the working directory, not the app package
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            return jsonify({'error': 'File not found'}), 404
+        
+        # send_file streams the file and handles If-None-Match, If-Modified-Since and Range
+        response = send_file(
+            path,
+            mimetype=mimetype,
+            etag=entry.get(f'{file_type}_sha256') or file_sha256(path),
+            conditional=True,
+            last_modified=os.path.getmtime(path),
+            max_age=ARTIFACT_MAX_AGE
+        )
+        # Generated artifacts never change once written, but they are personal data
+        response.cache_control.public = False
+        response.cache_control.private = True
+        response.cache_control.immutable = True
+        return response
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -345,23 +1116,8 @@ def profile():
 def get_profile_data():
     """Get current resume data merged with personal info."""
     try:
-        paths = get_profile_paths()
-        
-        if os.path.exists(paths['resume_data']):
-            with open(paths['resume_data'], 'r') as file:
-                resume_data = json.load(file)
-        else:
-            resume_data = {}
-            
-        if os.path.exists(paths['info']):
-            with open(paths['info'], 'r') as file:
-                info_data = json.load(file)
-        else:
-            info_data = {}
-            
-        # Merge data
-        data = {**resume_data, **info_data}
-        return jsonify(data)
+        # Merged resume data and personal info, served from the profile cache
+        return jsonify(load_profile_data())
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -371,56 +1127,28 @@ def save_profile_data():
     """Save new profile data (resume + info) and add to history."""
     try:
         new_data = request.json
-        paths = get_profile_paths()
         ensure_profile_dirs(get_active_profile())
-        
-        # Load current data to save to history
-        if os.path.exists(paths['resume_data']):
-            with open(paths['resume_data'], 'r') as file:
-                current_resume = json.load(file)
-        else:
-            current_resume = {}
-            
-        if os.path.exists(paths['info']):
-            with open(paths['info'], 'r') as file:
-                current_info = json.load(file)
-        else:
-            current_info = {}
-            
-        current_full_data = {**current_resume, **current_info}
-            
-        # Load existing history
-        if os.path.exists(paths['profile_history']):
-            with open(paths['profile_history'], 'r') as f:
-                history = json.load(f)
-        else:
-            history = []
-            
-        # Add current version to history
-        history_entry = {
-            'id': str(uuid.uuid4()),
-            'timestamp': datetime.now().isoformat(),
-            'data': current_full_data
-        }
-        history.append(history_entry)
-        
-        # Save history
-        with open(paths['profile_history'], 'w') as f:
-            json.dump(history, f, indent=4)
-            
-        # Split and save new data
+
+        # Split new data
         resume_keys = ['work', 'skills', 'professional_summary']
         info_keys = ['basics', 'education']
-        
+
         new_resume = {k: new_data.get(k) for k in resume_keys if k in new_data}
         new_info = {k: new_data.get(k) for k in info_keys if k in new_data}
-        
-        with open(paths['resume_data'], 'w') as f:
-            json.dump(new_resume, f, indent=4)
-            
-        with open(paths['info'], 'w') as f:
-            json.dump(new_info, f, indent=4)
-            
+
+        # Snapshot and overwrite under one lock, so no concurrent save is lost from history
+        with profile_write_lock():
+            # Add current version to history
+            history_entry = {
+                'id': str(uuid.uuid4()),
+                'timestamp': datetime.now().isoformat(),
+                'data': load_profile_data()
+            }
+            save_profile_history_entry(history_entry)
+
+            save_resume_data(new_resume)
+            save_info(new_info)
+
         return jsonify({'status': 'success', 'history_id': history_entry['id']})
         
     except Exception as e:
@@ -429,14 +1157,15 @@ def save_profile_data():
 
 @main.route('/get-profile-history', methods=['GET'])
 def get_profile_history():
-    """Get profile version history."""
+    """Get a page of profile versions, newest first.
+
+    Query parameters: cursor, limit, since, until (ISO date or datetime).
+    """
     try:
-        paths = get_profile_paths()
-        if os.path.exists(paths['profile_history']):
-            with open(paths['profile_history'], 'r') as f:
-                history = json.load(f)
-            return jsonify(history)
-        return jsonify([])
+        versions, next_cursor = query_profile_history(**_page_args())
+        return jsonify({'items': versions, 'next_cursor': next_cursor})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -446,12 +1175,8 @@ def restore_profile_version():
     """Restore a specific version from history."""
     try:
         version_id = request.json['id']
-        paths = get_profile_paths()
         
-        with open(paths['profile_history'], 'r') as f:
-            history = json.load(f)
-            
-        version = next((item for item in history if item['id'] == version_id), None)
+        version = get_profile_version(version_id)
         
         if not version:
             return jsonify({'error': 'Version not found'}), 404
@@ -464,12 +1189,11 @@ def restore_profile_version():
         new_resume = {k: data.get(k) for k in resume_keys if k in data}
         new_info = {k: data.get(k) for k in info_keys if k in data}
         
-        with open(paths['resume_data'], 'w') as f:
-            json.dump(new_resume, f, indent=4)
-            
-        if new_info:
-            with open(paths['info'], 'w') as f:
-                json.dump(new_info, f, indent=4)
+        # Resume data and info change together
+        with profile_write_lock():
+            save_resume_data(new_resume)
+            if new_info:
+                save_info(new_info)
             
         return jsonify({'status': 'success'})
         
@@ -481,11 +1205,7 @@ def restore_profile_version():
 def get_prompts():
     """Get saved prompts for the active profile."""
     try:
-        paths = get_profile_paths()
-        if os.path.exists(paths['prompts']):
-            with open(paths['prompts'], 'r') as f:
-                return jsonify(json.load(f))
-        return jsonify({})
+        return jsonify(load_profile_prompts())
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -494,12 +1214,7 @@ def get_prompts():
 def save_prompts():
     """Save prompts for the active profile."""
     try:
-        data = request.json
-        paths = get_profile_paths()
-        ensure_profile_dirs(get_active_profile())
-        
-        with open(paths['prompts'], 'w') as f:
-            json.dump(data, f, indent=4)
+        save_profile_prompts(request.json)
             
         return jsonify({'status': 'success'})
     except Exception as e:
@@ -509,7 +1224,11 @@ def save_prompts():
 @main.route('/health', methods=['GET'])
 def health_check():
     return {
-        'status': 'healthy'
+        'status': 'healthy',
+        'profile_cache': profile_cache_stats(),
+        # Renders on this process only; RENDER_BACKEND=process keeps sections in the workers
+        'section_cache': section_cache_stats(),
+        'llm_cache': llm_cache_stats()
     }
 
 
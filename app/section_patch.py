@@ -0,0 +1,75 @@
+"""Patch-mode prompting: send only the editable resume sections, get back a patch.
+
+The model sees a compact JSON document holding just the work highlights,
+professional_summary and skills (list positions match the full resume), and
+answers with a JSON Patch array. The patch is checked against the editable
+paths and applied to the original resume on the server.
+"""
+import re
+import json
+
+from .json_patch import apply_patch, JsonPatchError
+
+# Editable paths for /improve-resume; everything else in the resume is left as is
+_EDITABLE_PATHS = {
+    'replace': re.compile(r'^/(professional_summary|work/\d+/highlights/\d+|skills/\d+/keywords/\d+)$'),
+    'add': re.compile(r'^/skills/\d+/keywords/(\d+|-)$'),
+}
+
+PATCH_FORMAT_PROMPT = (
+    "**Response Format:**\n"
+    "Only the editable sections are included above, in compact JSON. Do not return the document, "
+    "whatever the instructions above say about the output format. "
+    "Return **ONLY** a JSON Patch (RFC 6902) array of the changes, for example "
+    '[{"op":"replace","path":"/work/0/highlights/2","value":"..."}]. '
+    "Use `replace` for professional_summary, work highlights and skill keywords, and `add` to insert a skill keyword. "
+    "Return [] if nothing should change."
+)
+
+EDIT_PATCH_FORMAT_PROMPT = (
+    "Return ONLY a JSON Patch (RFC 6902) array with the add, remove and replace operations that apply the instruction "
+    "to the JSON above, for example "
+    '[{"op":"replace","path":"/work/0/position","value":"..."}]. No markdown, no explanations.'
+)
+
+
+def compact_json(data):
+    """JSON without indentation or spaces after separators."""
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+def editable_sections(resume):
+    """The parts of a resume the improvement prompt may change."""
+    return {
+        'professional_summary': resume.get('professional_summary', ''),
+        'work': [{'highlights': job.get('highlights', [])} for job in resume.get('work', [])],
+        'skills': [{'name': skill.get('name', ''), 'keywords': skill.get('keywords', [])}
+                   for skill in resume.get('skills', [])]
+    }
+
+
+def parse_patch_response(content):
+    """Extract the patch array from a model response, tolerating fences and chatter."""
+    start = content.find('[')
+    end = content.rfind(']')
+    if start == -1 or end < start:
+        raise JsonPatchError('Model response did not contain a JSON Patch array')
+    # A list inside a returned object (e.g. the resume itself) is not the patch
+    if -1 < content.find('{') < start:
+        raise JsonPatchError('Model response is a JSON object, not a JSON Patch array')
+    try:
+        patch = json.loads(content[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise JsonPatchError(f"Model response is not valid JSON: {e}")
+    if not isinstance(patch, list) or not all(isinstance(op, dict) for op in patch):
+        raise JsonPatchError('Model response is not a JSON Patch array')
+    return patch
+
+
+def apply_section_patch(resume, patch):
+    """Apply a patch limited to the editable sections and return the new resume."""
+    for op in patch:
+        pattern = _EDITABLE_PATHS.get(op.get('op'))
+        if pattern is None or not pattern.match(str(op.get('path', ''))) or 'value' not in op:
+            raise JsonPatchError(f"Patch operation outside the editable sections: {compact_json(op)}")
+    return apply_patch(resume, patch)
@@ -1,95 +1,217 @@
 import os
 import json
 import shutil
-from openai import OpenAI
+import hashlib
+import threading
 from datetime import datetime
 
-# Constants
-PROFILES_DIR = 'profiles'
-DEFAULT_PROFILE = 'default'
-
-# Global state (simulated for now, ideally should be session based or database)
-active_profile = DEFAULT_PROFILE
-
-def get_active_profile():
-    return active_profile
+from .storage import get_storage, profile_paths, profile_lock, PROFILES_DIR, DEFAULT_PROFILE
+from .profile_context import get_active_profile
+from .json_patch import make_patch, apply_patch
+from .llm_client import get_openai_client
+from .llm_cache import company_key, get_cached_response, store_cached_response
 
-def set_active_profile(name):
-    global active_profile
-    active_profile = name
+# Constants
+MIGRATION_MARKER = os.path.join(PROFILES_DIR, '.migrated')
 
 def get_profile_dir(profile_name):
     return os.path.join(PROFILES_DIR, profile_name)
 
 def get_profile_paths(profile_name=None):
     if profile_name is None:
-        profile_name = active_profile
-    
-    base_dir = get_profile_dir(profile_name)
-    storage_dir = os.path.join(base_dir, 'generated')
-    
-    return {
-        'base': base_dir,
-        'resume_data': os.path.join(base_dir, 'resume_data.json'),
-        'info': os.path.join(base_dir, 'info.json'),
-        'storage': storage_dir,
-        'history': os.path.join(storage_dir, 'history.json'),
-        'profile_history': os.path.join(storage_dir, 'profile_history.json'),
-        'prompts': os.path.join(base_dir, 'prompts.json')
-    }
+        profile_name = get_active_profile()
+    return profile_paths(profile_name)
 
 def ensure_profile_dirs(profile_name):
     paths = get_profile_paths(profile_name)
-    if not os.path.exists(paths['storage']):
-        os.makedirs(paths['storage'])
-    
-    if not os.path.exists(paths['history']):
-        with open(paths['history'], 'w') as f:
-            json.dump([], f)
-            
-    if not os.path.exists(paths['profile_history']):
-        with open(paths['profile_history'], 'w') as f:
-            json.dump([], f)
-
-def load_history():
-    paths = get_profile_paths()
-    ensure_profile_dirs(active_profile)
-    if os.path.exists(paths['history']):
-        with open(paths['history'], 'r') as f:
-            return json.load(f)
-    return []
-
-def save_history_entry(entry):
-    paths = get_profile_paths()
-    ensure_profile_dirs(active_profile)
-    history = load_history()
-    history.append(entry)
-    with open(paths['history'], 'w') as f:
-        json.dump(history, f, indent=4)
-
-def extract_json_from_response(content):
-    """Extract JSON from AI response, handling markdown code blocks."""
-    content = content.strip()
-    
-    # Check if content is wrapped in markdown code blocks
-    if content.startswith('```'):
-        # Remove opening ```json or ```
-        lines = content.split('\n')
-        # Remove first line (```json or ```)
-        lines = lines[1:]
-        # Remove last line if it's ```
-        if lines and lines[-1].strip() == '```':
-            lines = lines[:-1]
-        content = '\n'.join(lines)
-    
-    return json.loads(content)
+    # Another worker may create it between the check and makedirs
+    os.makedirs(paths['storage'], exist_ok=True)
+
+def get_profile_names():
+    return get_storage().list_profiles()
+
+def profile_exists(name):
+    return get_storage().profile_exists(name)
+
+def init_profile(name):
+    """Create a profile with empty resume data and info."""
+    get_storage().create_profile(name)
+
+def remove_profile(name):
+    get_storage().delete_profile(name)
+
+def profile_write_lock(profile_name=None):
+    """Hold while reading and rewriting a profile so concurrent saves cannot interleave."""
+    return profile_lock(profile_name or get_active_profile())
+
+def _history_store(profile_name=None):
+    return get_storage().history_store(profile_name or get_active_profile())
+
+def _profile_history_store(profile_name=None):
+    return get_storage().version_store(profile_name or get_active_profile())
+
+HISTORY_PAGE_SIZE = 50
+MAX_HISTORY_PAGE_SIZE = 500
+
+def _until_bound(until):
+    # A bare date means the whole day
+    if until and len(until) == 10:
+        return until + 'T23:59:59.999999'
+    return until
+
+def query_history(cursor=None, limit=HISTORY_PAGE_SIZE, company=None, since=None, until=None):
+    """One page of generated resumes, newest first. Returns (entries, next_cursor)."""
+    ensure_profile_dirs(get_active_profile())
+    store = _history_store()
+    match = None
+    if company:
+        needle = company.lower()
+        match = lambda row: needle in (row.get('company_name') or '').lower()
+    positions, next_cursor = store.query(cursor, limit, since, _until_bound(until), match)
+    return store.read_positions(positions), next_cursor
+
+def get_history_entry(resume_id):
+    ensure_profile_dirs(get_active_profile())
+    return _history_store().get(resume_id)
+
+def save_history_entry(entry, profile_name=None):
+    save_history_entries([entry], profile_name)
+
+def save_history_entries(entries, profile_name=None):
+    """Append several entries with a single history write."""
+    profile_name = profile_name or get_active_profile()
+    ensure_profile_dirs(profile_name)
+    with profile_lock(profile_name):
+        _history_store(profile_name).extend(entries)
+
+# Profile versions are stored as a full keyframe every PROFILE_KEYFRAME_INTERVAL
+# saves, with JSON patches against the previous version in between.
+PROFILE_KEYFRAME_INTERVAL = 20
+
+def _is_keyframe(record):
+    # Records written before delta compression always carry the full 'data'
+    return 'data' in record
+
+def _materialize(records, index):
+    """Rebuild the full data for records[index] by replaying from the nearest keyframe."""
+    start = index
+    while not _is_keyframe(records[start]):
+        start -= 1
+    data = records[start]['data']
+    for record in records[start + 1:index + 1]:
+        data = apply_patch(data, record['patch'])
+    return data
+
+def _version(record, data):
+    return {'id': record['id'], 'timestamp': record['timestamp'], 'data': data}
+
+def query_profile_history(cursor=None, limit=HISTORY_PAGE_SIZE, since=None, until=None):
+    """One page of profile versions with full data, newest first. Returns (versions, next_cursor)."""
+    ensure_profile_dirs(get_active_profile())
+    store = _profile_history_store()
+    positions, next_cursor = store.query(cursor, limit, since, _until_bound(until))
+    if not positions:
+        return [], next_cursor
+
+    # Replay once from the keyframe before the oldest version on the page
+    first = min(positions)
+    while not _is_keyframe(store.read_positions([first])[0]):
+        first -= 1
+    records = store.read_range(first, max(positions))
+    wanted = set(positions)
+    materialized = {}
+    data = None
+    for offset, record in enumerate(records):
+        data = record['data'] if _is_keyframe(record) else apply_patch(data, record['patch'])
+        if first + offset in wanted:
+            materialized[first + offset] = _version(record, data)
+    return [materialized[p] for p in positions], next_cursor
+
+def get_profile_version(version_id):
+    ensure_profile_dirs(get_active_profile())
+    store = _profile_history_store()
+    index = store.position(version_id)
+    if index is None:
+        return None
+    start = index
+    while not _is_keyframe(store.read_positions([start])[0]):
+        start -= 1
+    records = store.read_range(start, index)
+    return _version(records[-1], _materialize(records, len(records) - 1))
+
+def save_profile_history_entry(entry):
+    """Append a version ({'id', 'timestamp', 'data'}) as a keyframe or a patch."""
+    ensure_profile_dirs(get_active_profile())
+    store = _profile_history_store()
+    with profile_write_lock():
+        count = store.count()
+        start = count - 1
+        while start >= 0 and not _is_keyframe(store.read_positions([start])[0]):
+            start -= 1
+        records = store.read_range(start, count - 1) if count else []
+
+        if not records or len(records) >= PROFILE_KEYFRAME_INTERVAL:
+            record = {'id': entry['id'], 'timestamp': entry['timestamp'], 'data': entry['data']}
+        else:
+            previous = _materialize(records, len(records) - 1)
+            record = {
+                'id': entry['id'],
+                'timestamp': entry['timestamp'],
+                'base': records[-1]['id'],
+                'patch': make_patch(previous, entry['data'])
+            }
+        store.append(record)
+
+# Profile documents go through the storage backend (see storage.py)
+def load_resume_data(profile_name=None):
+    """Parsed resume data. Shared between requests: do not mutate."""
+    return get_storage().load_document(profile_name or get_active_profile(), 'resume_data')
+
+def load_info(profile_name=None):
+    """Parsed personal info. Shared between requests: do not mutate."""
+    return get_storage().load_document(profile_name or get_active_profile(), 'info')
+
+def load_profile_data(profile_name=None):
+    """Resume data merged with personal info."""
+    return {**load_resume_data(profile_name), **load_info(profile_name)}
+
+def load_profile_prompts(profile_name=None):
+    return get_storage().load_document(profile_name or get_active_profile(), 'prompts')
+
+def save_resume_data(data, profile_name=None):
+    get_storage().save_document(profile_name or get_active_profile(), 'resume_data', data)
+
+def save_info(data, profile_name=None):
+    get_storage().save_document(profile_name or get_active_profile(), 'info', data)
+
+def save_profile_prompts(data, profile_name=None):
+    get_storage().save_document(profile_name or get_active_profile(), 'prompts', data)
+
+def profile_cache_stats():
+    return get_storage().cache_stats()
+
+_file_hashes = {}
+_file_hashes_lock = threading.Lock()
+
+def file_sha256(path):
+    """SHA-256 of a file's contents, memoized on (path, size, mtime)."""
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    with _file_hashes_lock:
+        digest = _file_hashes.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+        with _file_hashes_lock:
+            _file_hashes[key] = digest
+    return digest
 
 def extract_company_name(job_description, model='google/gemini-2.0-flash-001'):
     """Extract company name from job description using OpenRouter API."""
-    client = OpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        api_key=os.getenv("API_KEY")
-    )
+    client = get_openai_client()
     
     response = client.chat.completions.create(
         model=model,
@@ -105,8 +227,26 @@ def extract_company_name(job_description, model='google/gemini-2.0-flash-001'):
     
     return response.choices[0].message.content.strip()
 
+def get_company_name(job_description, model='google/gemini-2.0-flash-001', refresh=False):
+    """Company name for a job description, cached per normalized description.
+
+    Returns (company_name, cached). refresh skips the lookup but still stores the result.
+    """
+    key = company_key(job_description)
+    if not refresh:
+        company_name = get_cached_response(key)
+        if company_name is not None:
+            return company_name, True
+    company_name = extract_company_name(job_description, model)
+    store_cached_response(key, company_name)
+    return company_name, False
+
 def migrate_to_profiles():
     """Migrate existing files to default profile if they exist in root."""
+    # A single stat is enough once the migration has run
+    if os.path.exists(MIGRATION_MARKER):
+        return
+
     if not os.path.exists(PROFILES_DIR):
         os.makedirs(PROFILES_DIR)
 
@@ -138,3 +278,6 @@ def migrate_to_profiles():
             shutil.move('generated', os.path.join(default_dir, 'generated'))
         else:
             os.makedirs(os.path.join(default_dir, 'generated'))
+
+    with open(MIGRATION_MARKER, 'w') as f:
+        f.write(datetime.now().isoformat())
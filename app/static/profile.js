@@ -101,12 +101,19 @@ async function fetchProfileData() {
     }
 }
 
-async function fetchHistory() {
+const HISTORY_PAGE_SIZE = 50;
+let historyCursor = null;
+
+async function fetchHistory(loadMore = false) {
     try {
-        const response = await fetch('/get-profile-history');
-        const data = await response.json();
-        historyData = data;
-        renderHistory(data);
+        const params = new URLSearchParams({ limit: HISTORY_PAGE_SIZE });
+        if (loadMore && historyCursor) params.set('cursor', historyCursor);
+        const response = await fetch(`/get-profile-history?${params}`);
+        const page = await response.json();
+        // Pages arrive newest first
+        historyData = loadMore ? historyData.concat(page.items) : page.items;
+        historyCursor = page.next_cursor;
+        renderHistory(historyData);
     } catch (error) {
         console.error('Error fetching history:', error);
     }
@@ -454,9 +461,6 @@ function renderHistory(history) {
         return;
     }
 
-    // Sort descending
-    history.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
-
     historyList.innerHTML = history.map(item => `
         <div class="history-item" onclick="compareVersion('${item.id}')" id="hist-${item.id}">
             <div class="history-meta">${new Date(item.timestamp).toLocaleString()}</div>
@@ -465,7 +469,9 @@ function renderHistory(history) {
                 <button class="restore-btn" onclick="restoreVersion(event, '${item.id}')">Restore</button>
             </div>
         </div>
-    `).join('');
+    `).join('') + (historyCursor
+        ? '<button class="load-more-btn" onclick="fetchHistory(true)">Load more</button>'
+        : '');
 }
 
 // Compare Version (Diff)
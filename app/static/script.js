@@ -2,6 +2,7 @@
 const jobDescription = document.getElementById('jobDescription');
 const charCount = document.getElementById('charCount');
 const modelSelector = document.getElementById('modelSelector');
+const responseMode = document.getElementById('responseMode');
 
 jobDescription.addEventListener('input', () => {
     charCount.textContent = jobDescription.value.length;
@@ -132,8 +133,10 @@ form.addEventListener('submit', async (e) => {
         return;
     }
 
+    improvedResumeData = null;
+
     try {
-        const response = await fetch('/improve-resume', {
+        const response = await fetch('/improve-resume/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -143,7 +146,8 @@ form.addEventListener('submit', async (e) => {
                 pre_prompt: prePrompt,
                 post_prompt: postPrompt,
                 additional_context: additionalContext,
-                model: modelSelector.value
+                model: modelSelector.value,
+                mode: responseMode.value
             })
         });
 
@@ -152,32 +156,91 @@ form.addEventListener('submit', async (e) => {
             throw new Error(errorData.error || `Server error: ${response.status}`);
         }
 
-        const data = await response.json();
-
-        // Store data for later use
-        currentCompanyName = data.company_name;
-        originalResumeData = data.original;
-        improvedResumeData = data.improved;
+        // Sections are rendered as soon as the model finishes writing them
+        const partialWork = [];
+        const partialSkills = [];
+        let shown = false;
+        const showDiffEditor = () => {
+            if (shown) return;
+            shown = true;
+            diffEditor.classList.remove('hidden');
+            diffEditor.scrollIntoView({ behavior: 'smooth', block: 'start' });
+        };
+
+        await readSseStream(response, (event, data) => {
+            if (event === 'original') {
+                originalResumeData = data;
+            } else if (event === 'section') {
+                if (data.key === 'professional_summary') {
+                    populateProfessionalSummary(originalResumeData.professional_summary, data.value);
+                } else if (data.key === 'work' && data.index !== undefined) {
+                    partialWork[data.index] = data.value;
+                    populateWorkExperience(originalResumeData.work, partialWork.filter(Boolean));
+                } else if (data.key === 'skills' && data.index !== undefined) {
+                    partialSkills[data.index] = data.value;
+                    populateSkills(originalResumeData.skills, partialSkills.filter(Boolean));
+                } else {
+                    return;
+                }
+                showDiffEditor();
+            } else if (event === 'company') {
+                currentCompanyName = data.company_name;
+            } else if (event === 'improved') {
+                improvedResumeData = data;
+
+                // The complete result replaces the partial previews
+                populateProfessionalSummary(originalResumeData.professional_summary, data.professional_summary);
+                populateWorkExperience(originalResumeData.work, data.work);
+                populateSkills(originalResumeData.skills, data.skills);
+                showDiffEditor();
+            } else if (event === 'error') {
+                throw new Error(data.error);
+            }
+        });
 
-        // Populate work experience and skills sections
-        populateProfessionalSummary(data.original.professional_summary, data.improved.professional_summary);
-        populateWorkExperience(data.original.work, data.improved.work);
-        populateSkills(data.original.skills, data.improved.skills);
+        if (!improvedResumeData) {
+            throw new Error('The response ended before the improved resume was complete');
+        }
 
-        // Show diff editor
         submitBtn.classList.remove('loading');
         submitBtn.disabled = false;
-        diffEditor.classList.remove('hidden');
-
-        // Scroll to diff editor
-        diffEditor.scrollIntoView({ behavior: 'smooth', block: 'start' });
 
     } catch (error) {
         console.error('Error:', error);
+        diffEditor.classList.add('hidden');
         showError(error.message || 'Failed to generate improved resume. Please try again.');
     }
 });
 
+// Read a text/event-stream response, calling onEvent(event, data) per message
+async function readSseStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const message = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            const dataLines = [];
+            message.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) dataLines.push(line.slice(6));
+            });
+            if (dataLines.length) {
+                onEvent(event, JSON.parse(dataLines.join('\n')));
+            }
+        }
+    }
+}
+
 // Functions to populate resume sections
 // Diff Helper
 let dmp;
@@ -570,14 +633,27 @@ window.addEventListener('load', () => {
 });
 
 // History Functions
-async function fetchHistory() {
+const HISTORY_PAGE_SIZE = 50;
+let historyItems = [];
+let historyCursor = null;
+
+async function fetchHistory(loadMore = false) {
     try {
-        historyList.innerHTML = '<div class="loading-history">Loading history...</div>';
-        const response = await fetch('/history');
+        if (!loadMore) {
+            historyItems = [];
+            historyCursor = null;
+            historyList.innerHTML = '<div class="loading-history">Loading history...</div>';
+        }
+        const params = new URLSearchParams({ limit: HISTORY_PAGE_SIZE });
+        if (loadMore && historyCursor) params.set('cursor', historyCursor);
+        const response = await fetch(`/history?${params}`);
         if (!response.ok) throw new Error('Failed to fetch history');
 
-        const history = await response.json();
-        renderHistory(history);
+        // Pages arrive newest first
+        const page = await response.json();
+        historyItems = historyItems.concat(page.items);
+        historyCursor = page.next_cursor;
+        renderHistory(historyItems);
     } catch (error) {
         console.error('Error fetching history:', error);
         historyList.innerHTML = '<div class="error-message">Failed to load history</div>';
@@ -590,9 +666,6 @@ function renderHistory(history) {
         return;
     }
 
-    // Sort by timestamp descending
-    history.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
-
     historyList.innerHTML = history.map(item => `
         <div class="history-item">
             <div class="history-info">
@@ -618,7 +691,9 @@ function renderHistory(history) {
                 </a>
             </div>
         </div>
-    `).join('');
+    `).join('') + (historyCursor
+        ? '<button class="load-more-btn" onclick="fetchHistory(true)">Load more</button>'
+        : '');
 }
 
 // PDF Viewer Functions
@@ -642,7 +717,7 @@ pdfModal.addEventListener('click', (e) => {
 });
 
 // Event Listeners
-refreshHistoryBtn.addEventListener('click', fetchHistory);
+refreshHistoryBtn.addEventListener('click', () => fetchHistory());
 
 // Initial load
 fetchHistory();
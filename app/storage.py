@@ -0,0 +1,508 @@
+"""Pluggable storage for profiles, their documents and their history.
+
+STORAGE_BACKEND picks the implementation:
+
+- 'filesystem' (default): the profiles/<name>/ directory layout, with
+  resume_data.json, info.json, prompts.json and JSON Lines history.
+- 'sqlite': a single WAL-mode database (STORAGE_DB) with indexed tables for
+  profiles, documents, profile versions and generated artifacts.
+
+Both backends keep generated PDF/JSON files under profiles/<name>/generated/,
+and both hand out history stores with the HistoryStore interface, so the
+keyframe/patch logic in services works unchanged. Writes that span several
+documents or read before they write hold profile_lock(name), which excludes
+other threads and, where fcntl is available, other processes. Copy the
+filesystem layout into a database with:
+
+    python -m app.storage migrate [db_path]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # No cross-process locking on this platform; threads are still serialized
+    fcntl = None
+
+from .history_store import get_history_store, _encode_cursor, _decode_cursor
+
+PROFILES_DIR = 'profiles'
+DEFAULT_PROFILE = 'default'
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "filesystem")
+STORAGE_DB = os.getenv("STORAGE_DB", os.path.join(PROFILES_DIR, 'storage.sqlite3'))
+
+# Per-profile documents, each stored as one JSON object
+DOCUMENT_KINDS = ('resume_data', 'info', 'prompts')
+# Lock files, one per profile; dot-prefixed so it is never listed as a profile
+LOCKS_DIR = os.path.join(PROFILES_DIR, '.locks')
+
+
+def profile_paths(profile_name):
+    base_dir = os.path.join(PROFILES_DIR, profile_name)
+    storage_dir = os.path.join(base_dir, 'generated')
+
+    return {
+        'base': base_dir,
+        'resume_data': os.path.join(base_dir, 'resume_data.json'),
+        'info': os.path.join(base_dir, 'info.json'),
+        'storage': storage_dir,
+        'history': os.path.join(storage_dir, 'history.jsonl'),
+        'history_legacy': os.path.join(storage_dir, 'history.json'),
+        'profile_history': os.path.join(storage_dir, 'profile_history.jsonl'),
+        'profile_history_legacy': os.path.join(storage_dir, 'profile_history.json'),
+        'prompts': os.path.join(base_dir, 'prompts.json')
+    }
+
+
+class _ProfileLock:
+    """Re-entrant lock held by one thread in one process at a time.
+
+    A thread lock orders threads in this process; the outermost holder also
+    takes an exclusive flock on the profile's lock file, which other
+    processes wait on. Closing the file releases the flock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                except BaseException:
+                    os.close(fd)
+                    raise
+            except BaseException:
+                self._lock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._lock.release()
+
+
+_profile_locks = {}
+_profile_locks_guard = threading.Lock()
+
+
+def profile_lock(profile_name):
+    """Context manager serializing writes to one profile across threads and processes."""
+    with _profile_locks_guard:
+        lock = _profile_locks.get(profile_name)
+        if lock is None:
+            lock = _ProfileLock(os.path.join(LOCKS_DIR, f"{profile_name}.lock"))
+            _profile_locks[profile_name] = lock
+        return lock
+
+
+def write_json_atomic(path, doc):
+    """Write doc to a temp file beside path, fsync it and rename it over path.
+
+    Readers see either the old or the new file, never a partial one.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(doc, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class FilesystemStorage:
+    """The profiles/ directory layout.
+
+    Parsed documents are reused until the file's size or mtime changes or it
+    is written through here, and the profile list until the directory changes.
+    """
+
+    def __init__(self):
+        self._docs = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+        self._profiles = (None, [])
+
+    # -- profiles --------------------------------------------------------
+
+    def list_profiles(self):
+        if not os.path.exists(PROFILES_DIR):
+            os.makedirs(PROFILES_DIR)
+        # Adding or removing a profile directory changes the parent's mtime
+        signature = os.stat(PROFILES_DIR).st_mtime_ns
+        with self._lock:
+            if self._profiles[0] == signature:
+                return list(self._profiles[1])
+        profiles = [d for d in os.listdir(PROFILES_DIR)
+                    if not d.startswith('.') and os.path.isdir(os.path.join(PROFILES_DIR, d))]
+        with self._lock:
+            self._profiles = (signature, profiles)
+        return list(profiles)
+
+    def profile_exists(self, name):
+        return os.path.isdir(profile_paths(name)['base'])
+
+    def create_profile(self, name):
+        paths = profile_paths(name)
+        with profile_lock(name):
+            os.makedirs(paths['storage'])
+            # Initialize empty files
+            self.save_document(name, 'resume_data', {})
+            self.save_document(name, 'info', {})
+
+    def delete_profile(self, name):
+        with profile_lock(name):
+            shutil.rmtree(profile_paths(name)['base'])
+
+    # -- documents -------------------------------------------------------
+
+    def load_document(self, profile_name, kind):
+        path = profile_paths(profile_name)[kind]
+        signature = _file_signature(path)
+        with self._lock:
+            cached = self._docs.get(path)
+            if cached is not None and cached[0] == signature:
+                self._stats['hits'] += 1
+                return cached[1]
+            self._stats['misses'] += 1
+
+        if signature is None:
+            doc = {}
+        else:
+            with open(path, 'r') as f:
+                doc = json.load(f)
+        with self._lock:
+            self._docs[path] = (signature, doc)
+        return doc
+
+    def save_document(self, profile_name, kind, doc):
+        path = profile_paths(profile_name)[kind]
+        with profile_lock(profile_name):
+            write_json_atomic(path, doc)
+            signature = _file_signature(path)
+        with self._lock:
+            self._docs[path] = (signature, doc)
+
+    def cache_stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._docs))
+
+    # -- history ---------------------------------------------------------
+
+    def history_store(self, profile_name):
+        paths = profile_paths(profile_name)
+        return get_history_store(paths['history'], paths['history_legacy'], index_fields=('company_name',))
+
+    def version_store(self, profile_name):
+        paths = profile_paths(profile_name)
+        return get_history_store(paths['profile_history'], paths['profile_history_legacy'])
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    # Atomic saves replace the file, so the inode changes even if size and mtime do not
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    profile TEXT NOT NULL REFERENCES profiles (name) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (profile, kind)
+);
+CREATE TABLE IF NOT EXISTS profile_versions (
+    profile TEXT NOT NULL REFERENCES profiles (name) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    id TEXT,
+    ts TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (profile, seq)
+);
+CREATE INDEX IF NOT EXISTS profile_versions_ts ON profile_versions (profile, ts, seq);
+CREATE INDEX IF NOT EXISTS profile_versions_id ON profile_versions (profile, id);
+CREATE TABLE IF NOT EXISTS artifacts (
+    profile TEXT NOT NULL REFERENCES profiles (name) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    id TEXT,
+    ts TEXT NOT NULL,
+    company_name TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (profile, seq)
+);
+CREATE INDEX IF NOT EXISTS artifacts_ts ON artifacts (profile, ts, seq);
+CREATE INDEX IF NOT EXISTS artifacts_id ON artifacts (profile, id);
+"""
+
+
+class SQLiteStorage:
+    """Profiles, documents and history in one SQLite database (WAL mode)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self.connect()
+        with self.transaction():
+            conn.execute("INSERT OR IGNORE INTO profiles (name, created) VALUES (?, ?)",
+                         (DEFAULT_PROFILE, time.time()))
+
+    def connect(self):
+        """This thread's connection (sqlite3 connections are not shared across threads)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def transaction(self):
+        return _Transaction(self.connect())
+
+    # -- profiles --------------------------------------------------------
+
+    def list_profiles(self):
+        return [row[0] for row in self.connect().execute("SELECT name FROM profiles ORDER BY name")]
+
+    def profile_exists(self, name):
+        return self.connect().execute("SELECT 1 FROM profiles WHERE name = ?", (name,)).fetchone() is not None
+
+    def create_profile(self, name):
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO profiles (name, created) VALUES (?, ?)", (name, time.time()))
+            for kind in ('resume_data', 'info'):
+                conn.execute("INSERT INTO documents (profile, kind, data, updated) VALUES (?, ?, '{}', ?)",
+                             (name, kind, time.time()))
+        os.makedirs(profile_paths(name)['storage'], exist_ok=True)
+
+    def delete_profile(self, name):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM profiles WHERE name = ?", (name,))
+        # Generated PDFs live on disk with either backend
+        shutil.rmtree(profile_paths(name)['base'], ignore_errors=True)
+
+    # -- documents -------------------------------------------------------
+
+    def load_document(self, profile_name, kind):
+        row = self.connect().execute(
+            "SELECT data FROM documents WHERE profile = ? AND kind = ?", (profile_name, kind)
+        ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def save_document(self, profile_name, kind, doc):
+        with self.transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO profiles (name, created) VALUES (?, ?)",
+                         (profile_name, time.time()))
+            conn.execute(
+                "INSERT INTO documents (profile, kind, data, updated) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (profile, kind) DO UPDATE SET data = excluded.data, updated = excluded.updated",
+                (profile_name, kind, json.dumps(doc), time.time())
+            )
+
+    def cache_stats(self):
+        return {'hits': 0, 'misses': 0, 'entries': 0}
+
+    # -- history ---------------------------------------------------------
+
+    def history_store(self, profile_name):
+        return SQLiteRecordStore(self, 'artifacts', profile_name, index_fields=('company_name',))
+
+    def version_store(self, profile_name):
+        return SQLiteRecordStore(self, 'profile_versions', profile_name)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+
+class SQLiteRecordStore:
+    """HistoryStore interface over a table of (profile, seq) rows.
+
+    seq is the record's position in append order, so positions, ranges and
+    cursors mean the same as with the JSON Lines store.
+    """
+
+    def __init__(self, storage, table, profile_name, index_fields=()):
+        self.storage = storage
+        self.table = table
+        self.profile = profile_name
+        self.index_fields = tuple(index_fields)
+
+    def _select(self, where, params, columns='data'):
+        return self.storage.connect().execute(
+            f"SELECT {columns} FROM {self.table} WHERE profile = ? AND {where}", (self.profile, *params)
+        )
+
+    def all(self):
+        return [json.loads(row[0]) for row in self._select('1 ORDER BY seq', ())]
+
+    def count(self):
+        return self._select('1', (), 'COUNT(*)').fetchone()[0]
+
+    def get(self, entry_id):
+        row = self._select('id = ? ORDER BY seq DESC LIMIT 1', (entry_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def position(self, entry_id):
+        row = self._select('id = ? ORDER BY seq DESC LIMIT 1', (entry_id,), 'seq').fetchone()
+        return row[0] if row else None
+
+    def read_range(self, first, last):
+        rows = self._select('seq BETWEEN ? AND ? ORDER BY seq', (first, last))
+        return [json.loads(row[0]) for row in rows]
+
+    def read_positions(self, positions):
+        if not positions:
+            return []
+        placeholders = ', '.join('?' * len(positions))
+        rows = dict(self._select(f"seq IN ({placeholders})", tuple(positions), 'seq, data'))
+        return [json.loads(rows[p]) for p in positions]
+
+    def query(self, cursor=None, limit=None, since=None, until=None, match=None):
+        """Same contract as HistoryStore.query: (positions, next_cursor), newest first."""
+        where = ['1']
+        params = []
+        if cursor:
+            timestamp, seq = _decode_cursor(cursor)
+            where.append('(ts < ? OR (ts = ? AND seq < ?))')
+            params += [timestamp, timestamp, seq]
+        if since:
+            where.append('ts >= ?')
+            params.append(since)
+        if until:
+            where.append('ts <= ?')
+            params.append(until)
+        columns = ', '.join(('seq', 'id', 'ts') + self.index_fields)
+        rows = self._select(' AND '.join(where) + ' ORDER BY ts DESC, seq DESC', params, columns)
+
+        positions = []
+        last_key = None
+        for row in rows:
+            if match is not None:
+                index_row = {'id': row[1], 'ts': row[2]}
+                index_row.update(zip(self.index_fields, row[3:]))
+                if not match(index_row):
+                    continue
+            if limit is not None and len(positions) == limit:
+                return positions, _encode_cursor(last_key)
+            positions.append(row[0])
+            last_key = (row[2], row[0])
+        return positions, None
+
+    def append(self, entry):
+        self.extend([entry])
+
+    def extend(self, entries):
+        if not entries:
+            return
+        columns = ('profile', 'seq', 'id', 'ts') + self.index_fields + ('data',)
+        sql = (f"INSERT INTO {self.table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})")
+        # BEGIN IMMEDIATE serializes writers across processes, so seq stays dense
+        with self.storage.transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO profiles (name, created) VALUES (?, ?)",
+                         (self.profile, time.time()))
+            seq = conn.execute(f"SELECT COALESCE(MAX(seq) + 1, 0) FROM {self.table} WHERE profile = ?",
+                               (self.profile,)).fetchone()[0]
+            conn.executemany(sql, [
+                (self.profile, seq + i, entry.get('id'), entry.get('timestamp', ''),
+                 *(entry.get(field) for field in self.index_fields),
+                 json.dumps(entry, separators=(',', ':')))
+                for i, entry in enumerate(entries)
+            ])
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    """The process-wide storage backend selected by STORAGE_BACKEND."""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            if STORAGE_BACKEND == 'sqlite':
+                _storage = SQLiteStorage(STORAGE_DB)
+            elif STORAGE_BACKEND == 'filesystem':
+                _storage = FilesystemStorage()
+            else:
+                raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+        return _storage
+
+
+def migrate_filesystem_to_sqlite(db_path=STORAGE_DB):
+    """Copy every profile's documents and history into a SQLite database.
+
+    Profiles already in the database are replaced, so the copy can be re-run.
+    History records are copied as stored (profile versions keep their
+    keyframe/patch encoding). Returns the number of profiles copied.
+    """
+    source = FilesystemStorage()
+    target = SQLiteStorage(db_path)
+    profiles = source.list_profiles()
+    for name in profiles:
+        paths = profile_paths(name)
+        with target.transaction() as conn:
+            conn.execute("DELETE FROM profiles WHERE name = ?", (name,))
+            conn.execute("INSERT INTO profiles (name, created) VALUES (?, ?)",
+                         (name, os.stat(paths['base']).st_mtime))
+        for kind in DOCUMENT_KINDS:
+            if os.path.exists(paths[kind]):
+                target.save_document(name, kind, source.load_document(name, kind))
+        if os.path.exists(paths['storage']):
+            target.history_store(name).extend(source.history_store(name).all())
+            target.version_store(name).extend(source.version_store(name).all())
+    return len(profiles)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] != 'migrate':
+        print(f"usage: python -m app.storage migrate [db_path]  (default {STORAGE_DB})")
+        sys.exit(2)
+    db_path = sys.argv[2] if len(sys.argv) > 2 else STORAGE_DB
+    count = migrate_filesystem_to_sqlite(db_path)
+    print(f"Copied {count} profiles into {db_path}; set STORAGE_BACKEND=sqlite to use it")
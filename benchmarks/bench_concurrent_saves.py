@@ -0,0 +1,86 @@
+"""Throughput and integrity of concurrent profile saves across workers.
+
+Starts several processes, each with several threads, that all POST to
+/save-profile-data on the same profile. Every save snapshots the previous
+version into profile history, so afterwards the history must have grown by
+exactly the number of saves and the profile files must still parse. Uses a
+throwaway copy of `profiles/`. Run from the repository root:
+
+    python benchmarks/bench_concurrent_saves.py [processes] [threads] [saves_per_thread]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+import multiprocessing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def worker(workdir, threads, saves, start_event):
+    os.chdir(workdir)
+    from app import create_app
+    app = create_app()
+    with open('profiles/default/resume_data.json') as f:
+        resume = json.load(f)
+
+    def run(thread_id):
+        client = app.test_client()
+        for i in range(saves):
+            data = dict(resume, professional_summary=f"{os.getpid()}-{thread_id}-{i}")
+            response = client.post('/save-profile-data', json=data)
+            assert response.status_code == 200, response.json
+
+    start_event.wait()
+    pool = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    saves = int(sys.argv[3]) if len(sys.argv) > 3 else 25
+
+    workdir = tempfile.mkdtemp(prefix='resume-bench-')
+    shutil.copytree(os.path.join(ROOT, 'profiles'), os.path.join(workdir, 'profiles'))
+    os.chdir(workdir)
+    try:
+        from app.services import get_storage
+        before = get_storage().version_store('default').count()
+
+        start_event = multiprocessing.Event()
+        pool = [multiprocessing.Process(target=worker, args=(workdir, threads, saves, start_event))
+                for _ in range(processes)]
+        for process in pool:
+            process.start()
+        # Let the workers import the app before timing
+        time.sleep(2)
+        start = time.perf_counter()
+        start_event.set()
+        for process in pool:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        total = processes * threads * saves
+        after = get_storage().version_store('default').count()
+        for kind in ('resume_data', 'info'):
+            with open(f'profiles/default/{kind}.json') as f:
+                json.load(f)
+        print(f"{processes} processes x {threads} threads x {saves} saves")
+        print(f"{total} saves in {elapsed:.2f}s ({total / elapsed:.0f} saves/s)")
+        print(f"history grew by {after - before} (expected {total}), "
+              f"exit codes {[p.exitcode for p in pool]}")
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
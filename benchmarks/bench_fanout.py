@@ -0,0 +1,93 @@
+"""Fan-out and race over several models served by a stub LLM with per-model latency.
+
+Each stub model has its own latency; one returns invalid JSON. Fan-out
+should deliver results in latency order with a total close to the slowest
+model, and race should return the fastest valid model and abort the
+slower streams. Uses a throwaway copy of `profiles/`. Run from the
+repository root:
+
+    python benchmarks/bench_fanout.py
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stub_llm_server import start_stub_server
+
+# model id -> seconds to generate the rewrite
+MODEL_LATENCY = {
+    'stub/broken': 0.2,
+    'stub/fast': 0.4,
+    'stub/medium': 0.8,
+    'stub/slow': 1.6,
+}
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix='resume-bench-')
+    shutil.copytree(os.path.join(ROOT, 'profiles'), os.path.join(workdir, 'profiles'))
+    os.chdir(workdir)
+    with open('profiles/default/resume_data.json') as f:
+        resume_text = f.read()
+
+    def is_rewrite(body):
+        return 'Resume in JSON format' in body['messages'][-1]['content']
+
+    def latency(body):
+        return MODEL_LATENCY.get(body['model'], 0.1) if is_rewrite(body) else 0.1
+
+    def responder(body):
+        if not is_rewrite(body):
+            return 'Acme_Corp'
+        if body['model'] == 'stub/broken':
+            return '{"work": ['
+        return resume_text
+
+    server, base_url = start_stub_server(latency, responder)
+    os.environ['LLM_BASE_URL'] = base_url
+    os.environ['LLM_CACHE_DIR'] = ''
+    os.environ['LLM_MAX_RETRIES'] = '0'
+    os.environ.setdefault('API_KEY', 'stub')
+
+    try:
+        from app import create_app
+        from app.llm_client import get_openai_client
+        client = create_app().test_client()
+        get_openai_client()  # warm up the openai import
+        payload = {'description': 'Acme is hiring', 'models': list(MODEL_LATENCY), 'refresh': True}
+
+        start = time.perf_counter()
+        response = client.post('/improve-resume/fanout', json=payload, buffered=False)
+        print('fan-out (serial would be %.2fs):' % sum(MODEL_LATENCY.values()))
+        for chunk in response.response:
+            for message in chunk.decode('utf-8').split('\n\n'):
+                if not message.startswith('event: '):
+                    continue
+                event, data = message.split('\n', 1)
+                event = event[len('event: '):]
+                data = json.loads(data[len('data: '):])
+                if event in ('result', 'model_error'):
+                    print(f"  {time.perf_counter() - start:6.3f}s {event:<12}{data['model']}")
+        print(f"  {time.perf_counter() - start:6.3f}s done")
+
+        aborted = server.RequestHandlerClass.aborted
+        start = time.perf_counter()
+        body = client.post('/improve-resume/fanout', json=dict(payload, race=True)).json
+        elapsed = time.perf_counter() - start
+        time.sleep(max(MODEL_LATENCY.values()))  # let aborted streams notice the closed socket
+        print(f"race: {elapsed:.3f}s winner={body['model']} cancelled={body['cancelled']} "
+              f"streams aborted={server.RequestHandlerClass.aborted - aborted}")
+    finally:
+        server.shutdown()
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
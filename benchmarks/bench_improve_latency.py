@@ -0,0 +1,98 @@
+"""End-to-end /improve-resume latency against a stub LLM that injects latency.
+
+Checks that the resume rewrite and the company-name lookup overlap (wall time
+close to the slower call rather than the sum), and that a failing company
+lookup still returns the improved resume. Also times the first `section`
+event of /improve-resume/stream against the full response. Uses a throwaway copy of
+`profiles/`. Run from the repository root:
+
+    python benchmarks/bench_improve_latency.py [rewrite_seconds] [company_seconds]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stub_llm_server import start_stub_server
+
+
+def is_rewrite(body):
+    return 'Resume in JSON format' in body['messages'][-1]['content']
+
+
+def time_stream(client, payload):
+    """Return (seconds to first section event, seconds to done) for the SSE endpoint."""
+    start = time.perf_counter()
+    first_section = None
+    response = client.post('/improve-resume/stream', json=payload, buffered=False)
+    for chunk in response.response:
+        if first_section is None and b'event: section' in chunk:
+            first_section = time.perf_counter() - start
+    return first_section, time.perf_counter() - start
+
+
+def main():
+    rewrite_latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.6
+    company_latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    state = {'fail_company': False}
+
+    def latency(body):
+        return rewrite_latency if is_rewrite(body) else company_latency
+
+    def responder(body):
+        if is_rewrite(body):
+            with open('profiles/default/resume_data.json') as f:
+                return f.read()
+        if state['fail_company']:
+            raise RuntimeError('injected company lookup failure')
+        return 'Acme_Corp'
+
+    workdir = tempfile.mkdtemp(prefix='resume-bench-')
+    shutil.copytree(os.path.join(ROOT, 'profiles'), os.path.join(workdir, 'profiles'))
+    os.chdir(workdir)
+    server, base_url = start_stub_server(latency, responder)
+    os.environ['LLM_BASE_URL'] = base_url
+    os.environ['LLM_MAX_RETRIES'] = '0'
+    # Keep the response cache in memory so nothing is written next to the profiles copy
+    os.environ['LLM_CACHE_DIR'] = ''
+    os.environ.setdefault('API_KEY', 'stub')
+
+    try:
+        from app import create_app
+        client = create_app().test_client()
+        payload = {'description': 'Acme is hiring a Python engineer'}
+        client.post('/improve-resume', json=payload)  # warm up imports and connections
+        # Skip the LLM response cache so every measured call reaches the stub
+        payload = {**payload, 'refresh': True}
+
+        start = time.perf_counter()
+        response = client.post('/improve-resume', json=payload)
+        elapsed = time.perf_counter() - start
+        print(f"rewrite {rewrite_latency:.2f}s + company {company_latency:.2f}s "
+              f"(serial would be {rewrite_latency + company_latency:.2f}s)")
+        print(f"wall time {elapsed:.3f}s, status {response.status_code}, "
+              f"company_name={response.json.get('company_name')!r}")
+
+        first_section, total = time_stream(client, payload)
+        print(f"stream: first section {first_section:.3f}s, complete {total:.3f}s")
+
+        state['fail_company'] = True
+        response = client.post('/improve-resume', json=payload)
+        body = response.json
+        assert response.status_code == 200 and 'improved' in body, body
+        assert body.get('company_name_error'), 'company lookup failure was not reported'
+        print(f"company lookup failing: status {response.status_code}, "
+              f"improved returned={'improved' in body}, company_name_error={body.get('company_name_error')!r}")
+    finally:
+        server.shutdown()
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
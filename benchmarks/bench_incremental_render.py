@@ -0,0 +1,61 @@
+"""Render latency of the edit-preview loop with and without section reuse.
+
+Compares three cases per profile: every section rebuilt (section cache
+cleared before each render, i.e. the old behaviour), an unchanged resume,
+and a resume where one work highlight changes between renders. Run from the
+repository root:
+
+    python benchmarks/bench_incremental_render.py [iterations]
+"""
+import os
+import sys
+import json
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.pdf_generator import generate_reduced_top_margin_resume, clear_section_cache, register_fonts
+
+PROFILES = ['default', 'java']
+
+
+def load_profile(name):
+    base = os.path.join('profiles', name)
+    with open(os.path.join(base, 'resume_data.json'), 'r') as f:
+        resume_data = json.load(f)
+    with open(os.path.join(base, 'info.json'), 'r') as f:
+        info = json.load(f)
+    return {**resume_data, **info}
+
+
+def edited(resume, i):
+    work = [dict(job) for job in resume['work']]
+    work[0]['highlights'] = [f"{work[0]['highlights'][0]} (edit {i})"] + work[0]['highlights'][1:]
+    return {**resume, 'work': work}
+
+
+def timed(iterations, make_resume, before=None):
+    start = time.perf_counter()
+    for i in range(iterations):
+        if before:
+            before()
+        generate_reduced_top_margin_resume(BytesIO(), make_resume(i))
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    register_fonts()
+    for name in PROFILES:
+        resume = load_profile(name)
+        # Warm up both paths
+        timed(5, lambda i: resume)
+        print(f"{name}:")
+        print(f"  rebuild all sections  {timed(iterations, lambda i: resume, clear_section_cache):7.2f} ms")
+        print(f"  unchanged resume      {timed(iterations, lambda i: resume):7.2f} ms")
+        print(f"  one highlight edited  {timed(iterations, lambda i: edited(resume, i)):7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
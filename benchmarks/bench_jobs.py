@@ -0,0 +1,72 @@
+"""Submission latency and throughput of /jobs against a slow stub LLM.
+
+Submits a burst of improve jobs and reports how long the POSTs take (the
+request thread only persists and queues the job) and how long the burst
+takes to drain through JOB_WORKERS workers. Uses a throwaway copy of
+`profiles/`. Run from the repository root:
+
+    python benchmarks/bench_jobs.py [jobs] [workers] [latency_seconds]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stub_llm_server import start_stub_server
+
+
+def main():
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    workers = sys.argv[2] if len(sys.argv) > 2 else '4'
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.5
+
+    workdir = tempfile.mkdtemp(prefix='resume-bench-')
+    shutil.copytree(os.path.join(ROOT, 'profiles'), os.path.join(workdir, 'profiles'))
+    os.chdir(workdir)
+    with open('profiles/default/resume_data.json') as f:
+        resume_text = f.read()
+
+    def responder(body):
+        if 'Resume in JSON format' in body['messages'][-1]['content']:
+            return resume_text
+        return 'Acme_Corp'
+
+    server, base_url = start_stub_server(latency, responder)
+    os.environ['LLM_BASE_URL'] = base_url
+    os.environ['LLM_CACHE_DIR'] = ''
+    os.environ['LLM_MAX_RETRIES'] = '0'
+    os.environ['JOB_WORKERS'] = workers
+    os.environ.setdefault('API_KEY', 'stub')
+
+    try:
+        from app import create_app
+        from app.jobs import get_job, shutdown_job_workers
+        client = create_app().test_client()
+
+        start = time.perf_counter()
+        ids = [
+            client.post('/jobs', json={'type': 'improve', 'params': {'description': f'Job {i}'}}).json['id']
+            for i in range(jobs)
+        ]
+        submitted = time.perf_counter() - start
+        while any(get_job(job_id)['status'] not in ('succeeded', 'failed') for job_id in ids):
+            time.sleep(0.05)
+        drained = time.perf_counter() - start
+        failed = sum(get_job(job_id)['status'] == 'failed' for job_id in ids)
+
+        print(f"{jobs} jobs, {workers} workers, {latency:.2f}s model latency")
+        print(f"submit: {submitted * 1000 / jobs:.2f} ms/job")
+        print(f"drained in {drained:.2f}s ({jobs / drained:.2f} jobs/s), {failed} failed")
+        shutdown_job_workers()
+    finally:
+        server.shutdown()
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
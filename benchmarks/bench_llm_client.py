@@ -0,0 +1,59 @@
+"""Per-call latency of a fresh OpenAI client per call vs the shared pooled client.
+
+Uses a local stub server, so it measures client construction and connection
+setup rather than model time. Run from the repository root:
+
+    python benchmarks/bench_llm_client.py [calls]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_llm_server import start_stub_server
+
+
+def call(client):
+    client.chat.completions.create(
+        model='stub',
+        messages=[{'role': 'user', 'content': 'Job Description\nAcme is hiring'}]
+    )
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    server, base_url = start_stub_server()
+    os.environ['LLM_BASE_URL'] = base_url
+    os.environ.setdefault('API_KEY', 'stub')
+
+    from openai import OpenAI
+    from app import llm_client
+    llm_client.LLM_BASE_URL = base_url
+
+    def fresh_client_call():
+        # What every LLM round trip used to do
+        client = OpenAI(base_url=base_url, api_key=os.getenv("API_KEY"))
+        call(client)
+        client.close()
+
+    def pooled_client_call():
+        call(llm_client.get_openai_client())
+
+    print(f"{'mode':<10}{'ms/call':>10}{'connections':>14}")
+    for label, fn in (('fresh', fresh_client_call), ('pooled', pooled_client_call)):
+        fn()  # warm up
+        before = server.RequestHandlerClass.connections
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        elapsed_ms = (time.perf_counter() - start) * 1000 / calls
+        opened = server.RequestHandlerClass.connections - before
+        print(f"{label:<10}{elapsed_ms:>10.3f}{opened:>14}")
+
+    llm_client.reset_openai_client()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
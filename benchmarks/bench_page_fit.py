@@ -0,0 +1,77 @@
+"""Time to find a one-page layout, from measurements vs. from real layouts.
+
+fit_layout() measures the flowables once and replays the frame arithmetic
+for every probe. The comparison runs the same search but lays the whole
+document out (as /preview does) for every probe. Run from the repository
+root:
+
+    python benchmarks/bench_page_fit.py [iterations]
+"""
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.pdf_generator import scaled_theme, clear_section_cache, register_fonts, Layout
+from app.page_fit import fit_layout, _largest, MIN_FONT_SCALE, MIN_LEADING_SCALE, MIN_SPACING_SCALE, FONT_SCALE_STEP
+from app.preview import layout_resume
+
+PROFILES = ['default', 'java']
+
+
+def load_profile(name):
+    base = os.path.join('profiles', name)
+    with open(os.path.join(base, 'resume_data.json'), 'r') as f:
+        resume_data = json.load(f)
+    with open(os.path.join(base, 'info.json'), 'r') as f:
+        info = json.load(f)
+    return {**resume_data, **info}
+
+
+def fit_by_layout(resume, pages=1):
+    """The fit_layout search, with every probe a full layout."""
+    def fits(layout):
+        return len(layout_resume(resume, scaled_theme(layout)).pages) <= pages
+
+    fonts = [round(1 - i * FONT_SCALE_STEP, 3) for i in range(int(round((1 - MIN_FONT_SCALE) / FONT_SCALE_STEP)) + 1)]
+    low, high = 0, len(fonts) - 1
+    while low < high:
+        middle = (low + high) // 2
+        if fits(Layout(fonts[middle], MIN_LEADING_SCALE, MIN_SPACING_SCALE)):
+            high = middle
+        else:
+            low = middle + 1
+    font = fonts[low]
+    leading = _largest(lambda value: fits(Layout(font, value, MIN_SPACING_SCALE)), MIN_LEADING_SCALE, 1.0)
+    spacing = _largest(lambda value: fits(Layout(font, leading, value)), MIN_SPACING_SCALE, 1.0)
+    return Layout(font, leading, spacing)
+
+
+def timed(iterations, fn, before=None):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if before:
+            before()
+        result = fn()
+    return (time.perf_counter() - start) * 1000 / iterations, result
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    register_fonts()
+    for name in PROFILES:
+        resume = load_profile(name)
+        cold, fit = timed(iterations, lambda: fit_layout(resume), clear_section_cache)
+        warm, _ = timed(iterations, lambda: fit_layout(resume))
+        naive, layout = timed(max(1, iterations // 10), lambda: fit_by_layout(resume))
+        pages = len(layout_resume(resume, scaled_theme(fit.layout)).pages)
+        print(f"{name}: {tuple(fit.layout)} -> {pages} page(s), full-layout search found {tuple(layout)}")
+        print(f"  measured, cold sections  {cold:8.2f} ms")
+        print(f"  measured, warm sections  {warm:8.2f} ms")
+        print(f"  full layout per probe    {naive:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Latency of /preview (SVG and PNG) against a full /generate-pdf.
+
+Each request changes the professional summary so neither the preview cache
+nor the PDF render cache can answer it. Uses a throwaway copy of `profiles/`.
+Run from the repository root:
+
+    python benchmarks/bench_preview.py [iterations]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    workdir = tempfile.mkdtemp(prefix='resume-bench-')
+    shutil.copytree(os.path.join(ROOT, 'profiles'), os.path.join(workdir, 'profiles'))
+    os.chdir(workdir)
+    try:
+        from app import create_app
+        client = create_app().test_client()
+        with open('profiles/default/resume_data.json') as f:
+            resume = json.load(f)
+
+        def timed(path, body):
+            # Warm up fonts and caches
+            client.post(path, json=body(-1))
+            start = time.perf_counter()
+            for i in range(iterations):
+                response = client.post(path, json=body(i))
+                assert response.status_code == 200, response.get_data(as_text=True)
+            return (time.perf_counter() - start) * 1000 / iterations
+
+        def draft(i):
+            return dict(resume, professional_summary=f"{resume['professional_summary']} ({i})")
+
+        print(f"{iterations} edits, ms per request")
+        print(f"  /generate-pdf   {timed('/generate-pdf', lambda i: {'resume': draft(i), 'company_name': 'Bench'}):7.2f}")
+        print(f"  /preview svg    {timed('/preview', lambda i: {'resume': draft(i + iterations)}):7.2f}")
+        print(f"  /preview png    {timed('/preview', lambda i: {'resume': draft(i + 2 * iterations), 'format': 'png'}):7.2f}")
+        print(f"  /preview (hit)  {timed('/preview', lambda i: {'resume': draft(0)}):7.2f}")
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
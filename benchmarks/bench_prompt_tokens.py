@@ -0,0 +1,87 @@
+"""Token counts and latency of full-document vs patch-mode /improve-resume.
+
+The stub LLM charges a per-token latency (prompt tokens are cheaper than
+generated ones), so wall time tracks payload size the way a real model's
+does. Both modes make the same four keyword edits. Token counts are exact
+with tiktoken installed and estimated otherwise. Uses a throwaway copy of
+`profiles/`. Run from the repository root:
+
+    python benchmarks/bench_prompt_tokens.py [ms_per_prompt_token] [ms_per_completion_token]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stub_llm_server import start_stub_server
+
+
+def edited(resume):
+    """The resume with four keyword edits, as the model would make them."""
+    resume = json.loads(json.dumps(resume))
+    resume['professional_summary'] += ' Kubernetes.'
+    resume['work'][0]['highlights'][0] = resume['work'][0]['highlights'][0].replace('Designed', 'Architected')
+    resume['work'][0]['highlights'][1] += ' (FastAPI)'
+    resume['skills'][0]['keywords'].append('Terraform')
+    return resume
+
+
+def main():
+    prompt_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 0.05
+    completion_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+
+    workdir = tempfile.mkdtemp(prefix='resume-bench-')
+    shutil.copytree(os.path.join(ROOT, 'profiles'), os.path.join(workdir, 'profiles'))
+    os.chdir(workdir)
+    os.environ['LLM_CACHE_DIR'] = ''
+    os.environ['LLM_MAX_RETRIES'] = '0'
+    os.environ.setdefault('API_KEY', 'stub')
+
+    with open('profiles/default/resume_data.json') as f:
+        original = json.load(f)
+    target = edited(original)
+
+    def responder(body):
+        content = body['messages'][-1]['content']
+        if 'Editable resume sections' in content:
+            return json.dumps(make_patch(original, target))
+        if 'Resume in JSON format' in content:
+            return json.dumps(target, indent=4)
+        return 'Acme_Corp'
+
+    def latency(body):
+        prompt = ''.join(m['content'] for m in body['messages'])
+        return (count_tokens(prompt) * prompt_ms + count_tokens(responder(body)) * completion_ms) / 1000
+
+    server, base_url = start_stub_server(latency, responder)
+    # Set before the app package (and so llm_client) is imported
+    os.environ['LLM_BASE_URL'] = base_url
+    from app.json_patch import make_patch
+    from app.llm_client import count_tokens
+
+    try:
+        from app import create_app
+        client = create_app().test_client()
+        print(f"{'mode':<8}{'prompt':>10}{'completion':>12}{'seconds':>10}  same result")
+        for mode in ('full', 'patch'):
+            payload = {'description': 'Acme is hiring a Python engineer', 'mode': mode, 'refresh': True}
+            start = time.perf_counter()
+            body = client.post('/improve-resume', json=payload).json
+            elapsed = time.perf_counter() - start
+            tokens = body['tokens']
+            print(f"{mode:<8}{tokens['prompt']:>10}{tokens['completion']:>12}{elapsed:>10.3f}  "
+                  f"{body['improved'] == target}")
+        print(f"full-document baseline: {tokens['full_prompt']} prompt, {tokens['full_completion']} completion tokens")
+    finally:
+        server.shutdown()
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Micro-benchmark for PDF rendering with the shared theme vs a per-render theme.
+
+The theme comparison clears the section cache before every render so it
+measures the theme alone; the section cache's own saving is reported as a
+separate row (shared theme, sections kept from the previous render). Run
+from the repository root:
+
+    python benchmarks/bench_render.py [iterations]
+"""
+import os
+import sys
+import json
+import time
+import tracemalloc
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.pdf_generator import generate_reduced_top_margin_resume, _build_theme, clear_section_cache, DEFAULT_THEME
+
+PROFILES = ['default', 'java']
+
+
+def load_profile(name):
+    base = os.path.join('profiles', name)
+    with open(os.path.join(base, 'resume_data.json'), 'r') as f:
+        resume_data = json.load(f)
+    with open(os.path.join(base, 'info.json'), 'r') as f:
+        info = json.load(f)
+    return {**resume_data, **info}
+
+
+def per_render_theme(resume):
+    # What every render used to pay: a fresh style sheet and table styles
+    generate_reduced_top_margin_resume(BytesIO(), resume, theme=_build_theme())
+
+
+def shared_theme(resume):
+    generate_reduced_top_margin_resume(BytesIO(), resume, theme=DEFAULT_THEME)
+
+
+def measure(render, resume, iterations, cold_sections):
+    render(resume)  # warm up
+
+    total = 0
+    for _ in range(iterations):
+        if cold_sections:
+            clear_section_cache()
+        start = time.perf_counter()
+        render(resume)
+        total += time.perf_counter() - start
+    elapsed_ms = total * 1000 / iterations
+
+    if cold_sections:
+        clear_section_cache()
+    tracemalloc.start()
+    render(resume)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed_ms, peak / 1024
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    # Cost of the part that is now done once at import
+    start = time.perf_counter()
+    for _ in range(iterations):
+        _build_theme()
+    theme_ms = (time.perf_counter() - start) * 1000 / iterations
+    print(f"theme build: {theme_ms:.3f} ms (saved per render)\n")
+
+    modes = (
+        ('per-render', per_render_theme, True),
+        ('shared', shared_theme, True),
+        ('shared+sections', shared_theme, False),
+    )
+    print(f"{'profile':<10}{'mode':<17}{'ms/render':>12}{'peak KiB':>12}")
+    for name in PROFILES:
+        resume = load_profile(name)
+        for label, render, cold_sections in modes:
+            elapsed_ms, peak_kib = measure(render, resume, iterations, cold_sections)
+            print(f"{name:<10}{label:<17}{elapsed_ms:>12.3f}{peak_kib:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
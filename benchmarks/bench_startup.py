@@ -0,0 +1,67 @@
+"""Cold-start benchmark: app import, create_app() and first-request latency.
+
+Each run happens in a fresh interpreter against a throwaway copy of
+`profiles/`, so nothing in the working tree is touched. Run from the
+repository root:
+
+    python benchmarks/bench_startup.py [runs]
+"""
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import json, sys, time
+t0 = time.perf_counter()
+import app
+from app import create_app
+t1 = time.perf_counter()
+flask_app = create_app()
+t2 = time.perf_counter()
+client = flask_app.test_client()
+client.get('/health')
+t3 = time.perf_counter()
+with open('profiles/default/resume_data.json') as f:
+    resume = json.load(f)
+response = client.post('/generate-pdf', json={'resume': resume, 'company_name': 'bench'})
+t4 = time.perf_counter()
+print(json.dumps({
+    'import': t1 - t0,
+    'create_app': t2 - t1,
+    'first_request': t3 - t2,
+    'first_render': t4 - t3,
+    'status': response.status_code,
+}))
+'''
+
+
+def run_once():
+    workdir = tempfile.mkdtemp(prefix='resume-bench-')
+    try:
+        shutil.copytree(os.path.join(ROOT, 'profiles'), os.path.join(workdir, 'profiles'))
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        output = subprocess.check_output([sys.executable, '-c', CHILD], cwd=workdir, env=env)
+        return json.loads(output.decode().strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = [run_once() for _ in range(runs)]
+
+    for key in ('import', 'create_app', 'first_request', 'first_render'):
+        values = sorted(r[key] * 1000 for r in results)
+        print(f"{key:<15} median {values[len(values) // 2]:8.1f} ms   min {values[0]:8.1f} ms")
+    statuses = {r['status'] for r in results}
+    if statuses != {200}:
+        print(f"warning: /generate-pdf returned {sorted(statuses)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Save, load and list latency of the filesystem and SQLite storage backends.
+
+Creates N profiles (default 1000) in a throwaway directory for each backend,
+each holding a copy of the default profile's resume data and info, then
+times per-operation latency. "cold load" uses a fresh backend object, so the
+filesystem backend's parse cache is empty. Run from the repository root:
+
+    python benchmarks/bench_storage.py [profiles]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import storage
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) * 1e6 / len(items)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with open(os.path.join(ROOT, 'profiles', 'default', 'resume_data.json')) as f:
+        resume = json.load(f)
+    with open(os.path.join(ROOT, 'profiles', 'default', 'info.json')) as f:
+        info = json.load(f)
+    names = [f"profile-{i:05d}" for i in range(count)]
+
+    print(f"{count} profiles, microseconds per operation")
+    print(f"{'backend':<12}{'create':>10}{'save':>10}{'cold load':>11}{'warm load':>11}{'list':>10}")
+    for backend in ('filesystem', 'sqlite'):
+        workdir = tempfile.mkdtemp(prefix='resume-bench-')
+        os.chdir(workdir)
+        try:
+            def make():
+                if backend == 'sqlite':
+                    return storage.SQLiteStorage(storage.STORAGE_DB)
+                return storage.FilesystemStorage()
+
+            store = make()
+            create = timed(store.create_profile, names)
+            for name in names:
+                store.save_document(name, 'info', info)
+            save = timed(lambda name: store.save_document(name, 'resume_data', resume), names)
+            reader = make()
+            cold = timed(lambda name: reader.load_document(name, 'resume_data'), names)
+            warm = timed(lambda name: reader.load_document(name, 'resume_data'), names)
+            listing = timed(lambda _: store.list_profiles(), range(50))
+            print(f"{backend:<12}{create:>10.1f}{save:>10.1f}{cold:>11.1f}{warm:>11.1f}{listing:>10.1f}")
+        finally:
+            os.chdir(ROOT)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Render time of every registered resume template.
+
+For each template: the one-off cost of compiling its spec, then per profile
+a cold render (section cache cleared, so every paragraph is parsed) and a
+warm render (sections reused, as after the first request). Run from the
+repository root:
+
+    python benchmarks/bench_templates.py [iterations]
+"""
+import os
+import sys
+import json
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.pdf_generator import generate_reduced_top_margin_resume, compile_theme, clear_section_cache, register_fonts
+from app.resume_templates import get_template, get_template_spec, list_templates
+
+PROFILES = ['default', 'java']
+
+
+def load_profile(name):
+    base = os.path.join('profiles', name)
+    with open(os.path.join(base, 'resume_data.json'), 'r') as f:
+        resume_data = json.load(f)
+    with open(os.path.join(base, 'info.json'), 'r') as f:
+        info = json.load(f)
+    return {**resume_data, **info}
+
+
+def timed(iterations, fn, before=None):
+    total = 0
+    for _ in range(iterations):
+        if before:
+            before()
+        start = time.perf_counter()
+        fn()
+        total += time.perf_counter() - start
+    return total * 1000 / iterations
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    register_fonts()
+    resumes = {name: load_profile(name) for name in PROFILES}
+
+    print(f"{'template':<10}{'compile ms':>12}{'profile':>10}{'cold ms':>10}{'warm ms':>10}{'KiB':>8}")
+    for template in list_templates():
+        name = template['name']
+        theme = get_template(name)
+        compile_ms = timed(iterations, lambda: compile_theme(get_template_spec(name)))
+        for profile, resume in resumes.items():
+            def render():
+                buffer = BytesIO()
+                generate_reduced_top_margin_resume(buffer, resume, theme)
+                return buffer
+
+            render()  # warm up fonts
+            cold = timed(iterations, render, clear_section_cache)
+            warm = timed(iterations, render)
+            size = len(render().getvalue()) / 1024
+            print(f"{name:<10}{compile_ms:>12.3f}{profile:>10}{cold:>10.2f}{warm:>10.2f}{size:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""Local OpenAI-compatible chat completions server for benchmarks and manual testing.
+
+Requests with "stream": true get chat.completion.chunk Server-Sent Events.
+
+    from benchmarks.stub_llm_server import start_stub_server
+    server, base_url = start_stub_server(latency=0.2)
+    os.environ['LLM_BASE_URL'] = base_url   # before importing app.llm_client
+    ...
+    server.shutdown()
+
+Run directly to serve on a fixed port:
+
+    python benchmarks/stub_llm_server.py [port] [latency_seconds]
+"""
+import sys
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def default_responder(body):
+    return 'Acme_Corp'
+
+
+def _completion(body, content):
+    return {
+        'id': 'chatcmpl-stub',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': body.get('model', 'stub'),
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': content},
+            'finish_reason': 'stop'
+        }],
+        'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+    }
+
+
+def _chunk(body, delta, finish_reason=None):
+    return {
+        'id': 'chatcmpl-stub',
+        'object': 'chat.completion.chunk',
+        'created': int(time.time()),
+        'model': body.get('model', 'stub'),
+        'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]
+    }
+
+
+# Characters per streamed delta, roughly a few tokens
+STREAM_CHUNK_CHARS = 16
+
+
+def make_handler(latency, responder):
+    class StubHandler(BaseHTTPRequestHandler):
+        # HTTP/1.1 so clients can keep connections alive
+        protocol_version = 'HTTP/1.1'
+        # Avoid Nagle/delayed-ACK stalls between the header and body writes
+        disable_nagle_algorithm = True
+        connections = 0
+        # Streams the client closed before the end (e.g. a cancelled race)
+        aborted = 0
+
+        def setup(self):
+            super().setup()
+            type(self).connections += 1
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            delay = latency(body) if callable(latency) else latency
+            if body.get('stream'):
+                self._stream(body, delay)
+                return
+            if delay:
+                time.sleep(delay)
+            try:
+                status = 200
+                payload = _completion(body, responder(body))
+            except Exception as e:
+                # A raising responder simulates an upstream failure
+                status = 500
+                payload = {'error': {'message': str(e), 'type': 'server_error'}}
+            payload = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _write_chunk(self, data):
+            self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+
+        def _stream(self, body, delay):
+            # The latency is spread across the deltas, like a model generating tokens
+            try:
+                content = responder(body)
+            except Exception as e:
+                payload = json.dumps({'error': {'message': str(e), 'type': 'server_error'}}).encode('utf-8')
+                self.send_response(500)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+            pieces = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            events = [_chunk(body, {'role': 'assistant', 'content': ''})]
+            events += [_chunk(body, {'content': piece}) for piece in pieces]
+            events.append(_chunk(body, {}, 'stop'))
+            try:
+                for event in events:
+                    if delay and pieces:
+                        time.sleep(delay / len(events))
+                    self._write_chunk(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+            except (BrokenPipeError, ConnectionResetError):
+                type(self).aborted += 1
+                self.close_connection = True
+
+    return StubHandler
+
+
+def start_stub_server(latency=0.0, responder=default_responder, port=0):
+    """Serve in a background thread. latency is seconds or a callable(body) -> seconds."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(latency, responder))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    server, base_url = start_stub_server(latency, port=port)
+    print(f"Stub LLM server at {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()